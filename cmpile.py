@@ -3,6 +3,7 @@ import sys
 import subprocess
 import shlex
 import shutil
+import contextlib
 import concurrent.futures
 
 # Import our modules
@@ -22,12 +23,81 @@ CMAKE_BIN = os.path.join(download_script.CMAKE_DIR, "bin")
 CMAKE_EXE = os.path.join(CMAKE_BIN, "cmake.exe")
 GIT_CMD = os.path.join(download_script.INTERNAL_DOWNLOADS, "git", "cmd")
 
+def prepend_to_path(directory, move=False):
+    """
+    Puts directory at the front of PATH unless it is already an entry of it
+    (with move=True an existing entry is moved to the front instead).
+    Entries are compared whole, so repeated calls never grow PATH.
+    Returns True if PATH changed.
+    """
+    path = os.environ.get("PATH", "")
+    # Common case on repeated builds: already in front, nothing to split or normalize
+    if path == directory or path.startswith(directory + os.pathsep):
+        return False
+    key = os.path.normcase(os.path.normpath(directory))
+    entries = [e for e in path.split(os.pathsep) if e]
+    rest = [e for e in entries if os.path.normcase(os.path.normpath(e)) != key]
+    if len(rest) != len(entries) and not move:
+        return False
+    os.environ["PATH"] = os.pathsep.join([directory] + rest)
+    return True
+
+SOURCE_EXTS = frozenset(('c', 'cpp', 'cc', 'cxx'))
+
+def iter_source_files(root):
+    """
+    Yields the C/C++ source files under root. Uses os.scandir with an
+    explicit stack so directory entries never need an extra stat() call.
+    """
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    # A leading dot is a hidden file, not an extension
+                    name = entry.name
+                    dot = name.rfind('.')
+                    # is_file() last: it comes from d_type except for symlinks, and
+                    # drops dangling links, sockets and the like
+                    if dot > 0 and name[dot + 1:].lower() in SOURCE_EXTS and entry.is_file():
+                        yield entry.path
+
+def expand_source_files(paths):
+    """Expands directories in paths to the source files they contain."""
+    expanded_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            expanded_files.extend(iter_source_files(path))
+        elif os.path.isfile(path):
+            expanded_files.append(path)
+    return expanded_files
+
+def is_on_path(directory):
+    """True if directory is already a PATH entry (compared as in prepend_to_path)."""
+    key = os.path.normcase(os.path.normpath(directory))
+    return any(os.path.normcase(os.path.normpath(e)) == key
+               for e in os.environ.get("PATH", "").split(os.pathsep) if e)
+
+def remove_from_path(directory):
+    """Drops every PATH entry equal to directory. Returns True if PATH changed."""
+    key = os.path.normcase(os.path.normpath(directory))
+    entries = [e for e in os.environ.get("PATH", "").split(os.pathsep) if e]
+    rest = [e for e in entries if os.path.normcase(os.path.normpath(e)) != key]
+    if len(rest) == len(entries):
+        return False
+    os.environ["PATH"] = os.pathsep.join(rest)
+    return True
+
 def setup_git_env():
     """Adds local git to PATH if present."""
     if not download_script.is_tool_on_path("git") and os.path.exists(GIT_CMD):
-        if GIT_CMD not in os.environ["PATH"]:
-            os.environ["PATH"] = GIT_CMD + os.pathsep + os.environ["PATH"]
-            return True
+        return prepend_to_path(GIT_CMD)
     return False
 
 def ensure_environment(log_func, compiler_preference=None, reinstall_tools=False):
@@ -147,8 +217,7 @@ def ensure_environment(log_func, compiler_preference=None, reinstall_tools=False
             internal_paths_to_add.insert(0, winlibs_bin_found)
 
     for p in internal_paths_to_add:
-        if p not in os.environ["PATH"]:
-             os.environ["PATH"] = p + os.pathsep + os.environ["PATH"]
+        prepend_to_path(p)
 
     # Check CMake
     if not download_script.is_tool_on_path("cmake"):
@@ -160,8 +229,8 @@ def ensure_environment(log_func, compiler_preference=None, reinstall_tools=False
                 log_func(f"Failed to install CMake: {e}", "bold red")
                 raise e
         
-        if os.path.exists(CMAKE_BIN) and CMAKE_BIN not in os.environ["PATH"]:
-            os.environ["PATH"] = CMAKE_BIN + os.pathsep + os.environ["PATH"]
+        if os.path.exists(CMAKE_BIN):
+            prepend_to_path(CMAKE_BIN)
 
     # Check vcpkg
     vcpkg_mgr = vcpkg_automation.VcpkgManager(INTERNAL_DOWNLOADS, log_func=log_func)
@@ -360,12 +429,13 @@ class CmpileBuilder:
             self.log_callback(message, style)
         else:
             # Fallback to UI print if no callback (CLI mode)
-            if "error" in style or "bold red" in style:
-                ui.display_error(message)
-            elif "success" in style or "bold green" in style:
-                ui.display_success(message)
-            else:
-                ui.display_status(message)
+            ui.display_message(message, style)
+
+    def _log_batch(self):
+        # Bursts of terminal output are flushed once; GUI callbacks already batch on their side
+        if self.log_callback is None or self.log_callback is ui.display_message:
+            return ui.batched_output()
+        return contextlib.nullcontext()
 
     def copy_runtime_dlls(self, vcpkg_mgr, output_folder, required_packages):
         """Copies DLLs from vcpkg bin folder to output directory for all required packages."""
@@ -475,15 +545,7 @@ class CmpileBuilder:
         self.log("Analyzing source files for common issues...", "bold blue")
         
         # Expand source files to include all files in directories
-        expanded_files = []
-        for path in source_files:
-            if os.path.isdir(path):
-                for root, _, files in os.walk(path):
-                    for file in files:
-                        if file.endswith(('.c', '.cpp', '.C', '.CPP', '.cc', '.cxx')):
-                            expanded_files.append(os.path.join(root, file))
-            elif os.path.isfile(path):
-                expanded_files.append(path)
+        expanded_files = expand_source_files(source_files)
         
         if not expanded_files:
             self.log("No valid source files found.", "bold red")
@@ -575,15 +637,7 @@ class CmpileBuilder:
 
     def build_and_run(self, source_files, compiler_flags=None, clean=False, run=True, extra_includes=None, extra_lib_paths=None, extra_link_flags=None, extra_packages=None, build_dll=False, no_console=False, use_cmake=False, compiler_preference=None, reinstall_tools=False):
 
-        expanded_files = []
-        for path in source_files:
-            if os.path.isdir(path):
-                for root, _, files in os.walk(path):
-                    for file in files:
-                        if file.endswith(('.c', '.cpp', '.C', '.CPP', '.cc', '.cxx')):
-                            expanded_files.append(os.path.join(root, file))
-            elif os.path.isfile(path):
-                expanded_files.append(path)
+        expanded_files = expand_source_files(source_files)
 
         if not expanded_files:
             self.log("No valid source files found.", "bold red")
@@ -603,12 +657,14 @@ class CmpileBuilder:
             return False
 
         # 1.5 GitHub Fetches (CMake-like FetchContent)
-        ext_mgr = extensions.ExtensionManager()
         fetched_extensions_map = {} # repo_url -> ext
         
+        # Each source is read once for all directives; the sections below share the result
+        scans = dict(zip(files, package_finder.scan_sources(files)))
+
         # Scan for @fetch directives in all source files
         for src in files:
-            fetches = package_finder.find_github_fetches(src)
+            fetches = scans[src][1]
             for repo_url, version in fetches:
                 key = f"{repo_url}@{version}"
                 if key in fetched_extensions_map:
@@ -632,7 +688,7 @@ class CmpileBuilder:
         # 1.6 Local Libraries
         local_lib_map = {}
         for src in files:
-            local_libs = package_finder.find_local_libs(src)
+            local_libs = scans[src][2]
             for path, name, flags in local_libs:
                 # Resolve relative paths relative to the source file
                 if not os.path.isabs(path):
@@ -653,7 +709,7 @@ class CmpileBuilder:
         # 1.7 Vcpkg Directives
         vcpkg_directives = set()
         for src in files:
-            pkgs = package_finder.find_vcpkg_directives(src)
+            pkgs = scans[src][3]
             for pkg in pkgs:
                 self.log(f"Detected vcpkg directive: {pkg}")
                 vcpkg_directives.add(pkg)
@@ -692,10 +748,10 @@ class CmpileBuilder:
 
         # 2. Dependency Analysis
         all_includes = set()
-        for src in files:
-            self.log(f"Analyzing {os.path.basename(src)}...")
-            includes = package_finder.find_includes(src)
-            all_includes.update(includes)
+        with self._log_batch():
+            for src in files:
+                self.log(f"Analyzing {os.path.basename(src)}...")
+                all_includes.update(scans[src][0])
 
         # Filter out includes that are already provided by fetched extensions
         external_includes = set()
@@ -1138,23 +1194,14 @@ def main():
     print(f"╭──────────────╮\n│ Cmpile V{version.VERSION} │\n╰──────────────╯")
     args = ui.parse_arguments()
 
-    # Define a logger for the CLI that maps to the `ui` functions
-    def cli_logger(message, style=""):
-        if "error" in style or "bold red" in style:
-            ui.display_error(message)
-        elif "success" in style or "bold green" in style:
-            ui.display_success(message)
-        else:
-            ui.display_status(message)
-
-    # In CLI mode, the builder is provided with our CLI logger
-    builder = CmpileBuilder(log_callback=cli_logger)
+    # In CLI mode, the builder logs through the `ui` functions
+    builder = CmpileBuilder(log_callback=ui.display_message)
     
     # Handle file-independent operations
     if args.reinstall_tools:
         ui.display_status("Reinstalling tools...")
         try:
-            vcpkg_mgr = ensure_environment(cli_logger, reinstall_tools=True)
+            vcpkg_mgr = ensure_environment(ui.display_message, compiler_preference=args.compiler, reinstall_tools=True)
             ui.display_success("Tools installation/reinstallation completed!")
         except Exception as e:
             ui.display_error(f"Failed to reinstall tools: {e}")
@@ -1166,7 +1213,7 @@ def main():
             ui.display_status("Fixing environment...")
             try:
                 # Only reinstall tools if they're actually missing
-                vcpkg_mgr = ensure_environment(cli_logger, reinstall_tools=False)
+                vcpkg_mgr = ensure_environment(ui.display_message, compiler_preference=args.compiler, reinstall_tools=False)
                 ui.display_success("Environment fixed successfully!")
             except Exception as e:
                 ui.display_error(f"Failed to fix environment: {e}")
@@ -4,12 +4,23 @@ import shutil
 import zipfile
 import subprocess
 import requests
-import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import errno
-from rich.console import Console
-from rich.progress import Progress
+import concurrent.futures
+import contextlib
+import tempfile
+import version
 
-console = Console()
+# rich (and rich.progress in particular) is only imported once something is printed
+_console = None
+
+def _get_console():
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console(highlight=False)
+    return _console
 
 def is_tool_on_path(name):
     """Check whether `name` is on PATH and marked as executable."""
@@ -39,7 +50,40 @@ def get_install_bin_path(install_dir):
 
 def _default_log(message, style=""):
     # Helper for standalone script running
-    console.print(f"[{style}]{message}[/{style}]" if style else message)
+    _get_console().print(f"[{style}]{message}[/{style}]" if style else message)
+
+def _on_rm_error(func, path, exc_info):
+    # Clear the read-only bit and retry the removal
+    os.chmod(path, 0o777)
+    func(path)
+
+def _replace_dir(src, dst):
+    """
+    Moves the extracted folder src to dst, replacing any previous install.
+    The zip handle is closed by the time this runs, so a single os.replace
+    is enough; shutil.move is only used across volumes. The previous install
+    is renamed aside first and only deleted once the new one is in place, so
+    a failed move leaves it untouched.
+    """
+    old = None
+    if os.path.exists(dst):
+        old = dst + ".old"
+        if os.path.exists(old):
+            shutil.rmtree(old, onerror=_on_rm_error)
+        os.replace(dst, old)
+    try:
+        try:
+            os.replace(src, dst)
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.ENOTSUP):
+                raise
+            shutil.move(src, dst)
+    except Exception:
+        if old and not os.path.exists(dst):
+            os.replace(old, dst)
+        raise
+    if old:
+        shutil.rmtree(old, onerror=_on_rm_error)
 
 if getattr(sys, 'frozen', False):
     # Running as compiled exe
@@ -63,34 +107,132 @@ GIT_URL = "https://github.com/git-for-windows/git/releases/download/v2.53.0.wind
 
 GIT_DIR = os.path.join(INTERNAL_DOWNLOADS, "git")
 
+# Read/write unit for streamed downloads; large enough that per-chunk Python overhead is negligible
+CHUNK_SIZE = 1024 * 1024
+
+# (connect, read) timeout applied to every request
+HTTP_TIMEOUT = (5, 30)
+
+# Shared HTTP session so consecutive downloads reuse pooled connections to GitHub.
+# Archives are already compressed, so ask for them as-is. Transient server errors and
+# rate limiting are retried too; the last response is still handed to raise_for_status().
+SESSION = requests.Session()
+SESSION.headers["Accept-Encoding"] = "identity"
+SESSION.headers["User-Agent"] = f"Cmpile/{version.VERSION}"
+SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16,
+                                      max_retries=Retry(total=3, backoff_factor=0.3,
+                                                        status_forcelist=(429, 500, 502, 503, 504),
+                                                        raise_on_status=False)))
+
+def extract_zip(zip_path, dest):
+    """
+    Extracts zip_path into dest, copying each member with a CHUNK_SIZE buffer
+    instead of extractall's small default, and creating each directory once.
+    The archive itself is read through a CHUNK_SIZE buffer rather than 8 KiB.
+    Members are inflated on a thread pool; zlib releases the GIL while it works.
+    zip_path may also be an open binary file, e.g. from download_spooled.
+    """
+    dest = os.path.abspath(dest)
+    if isinstance(zip_path, (str, bytes, os.PathLike)):
+        source = open(zip_path, "rb", buffering=CHUNK_SIZE)
+    else:
+        source = contextlib.nullcontext(zip_path)
+    with source as archive, zipfile.ZipFile(archive, 'r') as zip_ref:
+        members = []
+        dirs = {dest}
+        for info in zip_ref.infolist():
+            target = os.path.normpath(os.path.join(dest, info.filename))
+            if os.path.commonpath([dest, target]) != dest:
+                raise Exception(f"Unsafe path in archive: {info.filename}")
+            if info.is_dir():
+                dirs.add(target)
+            else:
+                members.append((info, target))
+                dirs.add(os.path.dirname(target))
+        for d in sorted(dirs):
+            os.makedirs(d, exist_ok=True)
+
+        def copy_member(member):
+            info, target = member
+            with zip_ref.open(info) as src, open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst, length=CHUNK_SIZE)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() or 2) as pool:
+            for _ in pool.map(copy_member, members):
+                pass
+
+def preallocate(f, size):
+    """
+    Reserves size bytes for the open file f up front so the filesystem can lay the
+    download out contiguously. Callers truncate to the bytes actually written.
+    """
+    if size <= 0:
+        return
+    try:
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(f.fileno(), 0, size)
+        else:
+            f.truncate(size)
+    except OSError:
+        pass
+
 def download_file(url, target_path, log_func=_default_log):
     # If a custom log_func is provided, we avoid using the Rich progress bar
     # as it's not suitable for GUI logs.
     use_progress = (log_func == _default_log) and sys.stdout is not None and getattr(sys.stdout, 'isatty', lambda: False)()
 
     try:
-        with requests.get(url, stream=True) as response:
+        with SESSION.get(url, stream=True, timeout=HTTP_TIMEOUT) as response:
             response.raise_for_status()
             total_size = int(response.headers.get("content-length", 0))
+            # Copy the body straight from the socket in CHUNK_SIZE reads
+            response.raw.decode_content = True
 
             if use_progress:
-                with Progress(console=console) as progress:
+                from rich.progress import Progress
+                with Progress(console=_get_console()) as progress:
                     task = progress.add_task(f"Downloading {os.path.basename(target_path)}...", total=total_size)
-                    with open(target_path, "wb") as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                            progress.update(task, advance=len(chunk))
+                    with open(target_path, "wb", buffering=CHUNK_SIZE) as f:
+                        preallocate(f, total_size)
+                        shutil.copyfileobj(progress.wrap_file(response.raw, task_id=task), f, length=CHUNK_SIZE)
+                        f.truncate(f.tell())
             else:
                 log_func(f"Downloading {os.path.basename(target_path)} ({total_size / 1024 / 1024:.2f} MB)...")
-                with open(target_path, "wb") as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
+                with open(target_path, "wb", buffering=CHUNK_SIZE) as f:
+                    preallocate(f, total_size)
+                    shutil.copyfileobj(response.raw, f, length=CHUNK_SIZE)
+                    f.truncate(f.tell())
                 log_func("Download complete.")
 
     except Exception as e:
         log_func(f"Failed to download {url}: {e}", "bold red")
         raise e
 
+# Downloads up to this size stay in memory in download_spooled; larger ones go to a temp file
+SPOOL_MAX = 16 * 1024 * 1024
+
+def download_spooled(url, log_func=_default_log):
+    """
+    Downloads url into a SpooledTemporaryFile and returns it rewound, for
+    archives that are only extracted once and don't need a named file on disk.
+    The caller closes it.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX)
+    try:
+        with SESSION.get(url, stream=True, timeout=HTTP_TIMEOUT) as response:
+            response.raise_for_status()
+            total_size = int(response.headers.get("content-length", 0))
+            response.raw.decode_content = True
+            log_func(f"Downloading {url.rsplit('/', 1)[-1]} ({total_size / 1024 / 1024:.2f} MB)...")
+            shutil.copyfileobj(response.raw, spool, length=CHUNK_SIZE)
+            log_func("Download complete.")
+    except Exception as e:
+        spool.close()
+        log_func(f"Failed to download {url}: {e}", "bold red")
+        raise e
+    spool.seek(0)
+    return spool
+
 def install_git(log_func=_default_log):
     if is_tool_on_path("git"):
         log_func("Git is already available on PATH.", "bold blue")
@@ -112,8 +254,7 @@ def install_git(log_func=_default_log):
     log_func("Extracting Git...")
     try:
         os.makedirs(GIT_DIR, exist_ok=True)
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(GIT_DIR)
+        extract_zip(zip_path, GIT_DIR)
 
         log_func("Git installed successfully.", "bold green")
         os.remove(zip_path)
@@ -134,8 +275,7 @@ def install_llvm(log_func=_default_log):
 
     log_func("Extracting LLVM-MinGW...")
     try:
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(INTERNAL_DOWNLOADS)
+        extract_zip(zip_path, INTERNAL_DOWNLOADS)
 
         extracted_name = None
         for name in os.listdir(INTERNAL_DOWNLOADS):
@@ -146,33 +286,7 @@ def install_llvm(log_func=_default_log):
         if extracted_name:
                 extracted_path = os.path.join(INTERNAL_DOWNLOADS, extracted_name)
 
-                max_retries = 5
-                for i in range(max_retries):
-                    try:
-                        if os.path.exists(LLVM_DIR):
-                            def on_rm_error(func, path, exc_info):
-                                os.chmod(path, 0o777)
-                                func(path)
-                            shutil.rmtree(LLVM_DIR, onerror=on_rm_error)
-                        
-                        # Verify it's gone
-                        if os.path.exists(LLVM_DIR):
-                             time.sleep(1)
-                             try:
-                                 shutil.rmtree(LLVM_DIR)
-                             except:
-                                 pass
-                                 
-                        if os.path.exists(LLVM_DIR):
-                             raise OSError(f"Could not remove existing directory {LLVM_DIR}")
-
-                        time.sleep(0.5)
-                        shutil.move(extracted_path, LLVM_DIR)
-                        break
-                    except (PermissionError, OSError) as e:
-                        if (isinstance(e, OSError) and e.errno not in [errno.EACCES, errno.ENOTEMPTY]) or i == max_retries - 1:
-                            raise
-                        time.sleep(1)
+                _replace_dir(extracted_path, LLVM_DIR)
         else:
             raise Exception(f"Extraction failed: Could not find llvm-mingw folder in {INTERNAL_DOWNLOADS}")
 
@@ -207,33 +321,13 @@ def install_winlibs(log_func=_default_log):
 
     log_func("Extracting WinLibs GCC...")
     try:
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(INTERNAL_DOWNLOADS)
+        extract_zip(zip_path, INTERNAL_DOWNLOADS)
         
         # WinLibs extracts to a 'mingw64' folder
         extracted_path = os.path.join(INTERNAL_DOWNLOADS, "mingw64")
         
         if os.path.exists(extracted_path):
-            if os.path.exists(WINLIBS_DIR):
-                def on_rm_error(func, path, exc_info):
-                    os.chmod(path, 0o777)
-                    func(path)
-                shutil.rmtree(WINLIBS_DIR, onerror=on_rm_error)
-            
-            # Verify it's gone
-            if os.path.exists(WINLIBS_DIR):
-                 time.sleep(1)
-                 try:
-                     shutil.rmtree(WINLIBS_DIR)
-                 except:
-                     pass
-                     
-            if os.path.exists(WINLIBS_DIR):
-                 raise OSError(f"Could not remove existing directory {WINLIBS_DIR}")
-            
-            # Wait a bit for file locks
-            time.sleep(1)
-            shutil.move(extracted_path, WINLIBS_DIR)
+            _replace_dir(extracted_path, WINLIBS_DIR)
         else:
              raise Exception("Could not find 'mingw64' folder in extracted WinLibs archive")
 
@@ -266,11 +360,7 @@ def install_cmake(log_func=_default_log):
 
     log_func("Extracting CMake...")
     try:
-        if os.path.exists(CMAKE_DIR):
-             shutil.rmtree(CMAKE_DIR)
-             
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(INTERNAL_DOWNLOADS)
+        extract_zip(zip_path, INTERNAL_DOWNLOADS)
         
         extracted_name = None
         for name in os.listdir(INTERNAL_DOWNLOADS):
@@ -279,7 +369,7 @@ def install_cmake(log_func=_default_log):
                 break
         
         if extracted_name:
-             shutil.move(os.path.join(INTERNAL_DOWNLOADS, extracted_name), CMAKE_DIR)
+             _replace_dir(os.path.join(INTERNAL_DOWNLOADS, extracted_name), CMAKE_DIR)
         else:
              raise Exception("Could not find extracted CMake folder")
 
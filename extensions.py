@@ -6,19 +6,622 @@ import shutil
 import threading
 import stat
 import time
+import hashlib
+import tempfile
+import mmap
+import contextlib
+import functools
+import collections
+import concurrent.futures
+import struct
+import zlib
+import uuid
 import download_script
+try:
+    # Optional: faster whole-buffer inflate for deflated zip members
+    import libdeflate
+except ImportError:
+    libdeflate = None
+try:
+    # Optional: faster (de)serialisation of the extension/fetch cache JSON files
+    import orjson
+except ImportError:
+    orjson = None
 
 import json
+import re
 
 # Use a dedicated directory for extensions
 EXTENSIONS_DIR = os.path.join(os.getcwd(), "extensions")
 CUSTOM_EXTENSIONS_FILE = os.path.join(EXTENSIONS_DIR, "custom_extensions.json")
 
+# Shared with download_script so consecutive installs reuse the TCP/TLS connection to GitHub
+_SESSION = download_script.SESSION
+
+# Read buffer for zip archives on disk; zipfile otherwise reads through the default 8 KiB buffer
+ZIP_READ_BUFFER = 256 * 1024
+# Downloaded archives up to this size stay in memory; larger ones spill to a temp file
+ARCHIVE_SPOOL_MAX = 64 * 1024 * 1024
+
+# Parallel jobs handed to make / cmake --build
+BUILD_JOBS = os.cpu_count() or 2
+# Compile steps run one at a time when several installs overlap; each already uses BUILD_JOBS cores
+_BUILD_LOCK = threading.Semaphore(1)
+
+def _cmake_generator_args():
+    # Ninja when available (parallel by default, fast dependency scanning);
+    # otherwise MinGW Makefiles on Windows to match Cmpile's toolchain.
+    if shutil.which("ninja"):
+        return ["-G", "Ninja"]
+    if os.name == 'nt' and shutil.which("mingw32-make"):
+        return ["-G", "MinGW Makefiles"]
+    return []
+
+def _compiler_launcher():
+    # sccache/ccache, when installed, so reinstalls hit the compiler cache
+    return shutil.which("sccache") or shutil.which("ccache")
+
+def _compiler_launcher_args():
+    launcher = _compiler_launcher()
+    if not launcher:
+        return []
+    return [f"-DCMAKE_C_COMPILER_LAUNCHER={launcher}", f"-DCMAKE_CXX_COMPILER_LAUNCHER={launcher}"]
+
+def _cmake_build_cmd(build_dir=".", target=None):
+    # --parallel reaches every generator (Ninja, make, MSBuild), including MinGW Makefiles
+    cmd = ["cmake", "--build", build_dir, "--config", "Release", "--parallel", str(BUILD_JOBS)]
+    if target:
+        cmd.extend(["--target", target])
+    return cmd
+
+# Written next to CMakeCache.txt to record which arguments the build tree was configured with
+CMAKE_SIGNATURE_FILE = "cmake_args.sig"
+
+def _cmake_signature(cmake_args):
+    return hashlib.sha1(repr(cmake_args).encode()).hexdigest()
+
+def _cmake_cache_is_current(build_dir, cmake_args):
+    # A configured build tree can be reused if it was configured with the same arguments
+    if not os.path.exists(os.path.join(build_dir, "CMakeCache.txt")):
+        return False
+    try:
+        with open(os.path.join(build_dir, CMAKE_SIGNATURE_FILE), "r") as f:
+            return f.read().strip() == _cmake_signature(cmake_args)
+    except OSError:
+        return False
+
+def _write_cmake_signature(build_dir, cmake_args):
+    with open(os.path.join(build_dir, CMAKE_SIGNATURE_FILE), "w") as f:
+        f.write(_cmake_signature(cmake_args))
+
+# Number of trailing build-log lines kept for error messages
+BUILD_LOG_TAIL = 200
+
+def _run_streamed(cmd, cwd=None, progress_callback=None):
+    # Forward output line by line instead of buffering the whole log;
+    # only the tail is kept around for the error message.
+    tail = collections.deque(maxlen=BUILD_LOG_TAIL)
+    # Nested cmake --build invocations (e.g. ExternalProject) pick up the job count from here
+    env = dict(os.environ)
+    env.setdefault("CMAKE_BUILD_PARALLEL_LEVEL", str(BUILD_JOBS))
+    proc = subprocess.Popen(cmd, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+    with proc:
+        for line in proc.stdout:
+            line = line.rstrip()
+            tail.append(line)
+            if progress_callback: progress_callback(line)
+    return proc.returncode, "\n".join(tail)
+
+def _download_archive(url):
+    # Stream the archive into a spooled temp file: small zips never touch the disk,
+    # large ones spill to a temp file, and there is no zip left behind to clean up.
+    spool = tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_MAX, buffering=ZIP_READ_BUFFER)
+    with _SESSION.get(url, stream=True, timeout=download_script.HTTP_TIMEOUT) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        shutil.copyfileobj(response.raw, spool, length=download_script.CHUNK_SIZE)
+    spool.seek(0)
+    return spool
+
+class _RangeNotHonoured(Exception):
+    pass
+
+def _download_archive_ranged(url, parts=4):
+    # Fetch byte ranges on parallel connections; falls back to a single stream when the
+    # server does not advertise ranges or answers a ranged request with the full body.
+    head = _SESSION.head(url, allow_redirects=True, timeout=download_script.HTTP_TIMEOUT)
+    size = int(head.headers.get("Content-Length") or 0)
+    if not head.ok or head.headers.get("Accept-Ranges") != "bytes" or size < parts * download_script.CHUNK_SIZE:
+        return _download_archive(url)
+
+    target = tempfile.TemporaryFile(buffering=ZIP_READ_BUFFER)
+    target.truncate(size)
+    fd = target.fileno()
+    lock = threading.Lock()
+
+    def fetch(start, end):
+        headers = {"Range": f"bytes={start}-{end}"}
+        with _SESSION.get(head.url, headers=headers, stream=True, timeout=download_script.HTTP_TIMEOUT) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise _RangeNotHonoured()
+            offset = start
+            for chunk in response.iter_content(chunk_size=download_script.CHUNK_SIZE):
+                if hasattr(os, "pwrite"):
+                    os.pwrite(fd, chunk, offset)
+                else:
+                    with lock:
+                        os.lseek(fd, offset, os.SEEK_SET)
+                        os.write(fd, chunk)
+                offset += len(chunk)
+        if offset != end + 1:
+            raise IOError(f"Incomplete range {start}-{end} from {url}")
+
+    step = -(-size // parts)
+    ranges = [(a, min(a + step, size) - 1) for a in range(0, size, step)]
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+            for _ in pool.map(lambda r: fetch(*r), ranges):
+                pass
+    except _RangeNotHonoured:
+        target.close()
+        return _download_archive(url)
+    except Exception:
+        target.close()
+        raise
+    target.seek(0)
+    return target
+
+# Validators (ETag / Last-Modified / SHA-256) of downloaded archives, keyed by URL
+FETCH_CACHE_FILE = os.path.join(EXTENSIONS_DIR, ".fetch_cache.json")
+_FETCH_CACHE_LOCK = threading.Lock()
+
+def _json_loads(data):
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(obj):
+    # Compact on both paths, so the files are byte-identical with or without orjson
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def _write_json(path, obj):
+    # Serialize first and swap the file in whole, so a crash never leaves it truncated
+    data = _json_dumps(obj)
+    partial = path + ".tmp"
+    with open(partial, 'wb') as f:
+        f.write(data)
+    os.replace(partial, path)
+
+def _load_fetch_cache():
+    try:
+        with open(FETCH_CACHE_FILE, 'rb') as f:
+            return _json_loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
+def _update_fetch_cache(url, entry):
+    with _FETCH_CACHE_LOCK:
+        cache = _load_fetch_cache()
+        cache[url] = entry
+        os.makedirs(EXTENSIONS_DIR, exist_ok=True)
+        _write_json(FETCH_CACHE_FILE, cache)
+
+CACHE_DIR = os.path.join(EXTENSIONS_DIR, ".cache")
+
+def _cached_archive(url, filename, downloader=_download_archive):
+    # Reuse a previously downloaded archive while the server still reports the same ETag
+    # (or, before one has been recorded, the same size), or cannot be reached at all;
+    # otherwise download it and keep a copy for next time.
+    cache_path = os.path.join(CACHE_DIR, filename)
+    etag = None
+    if os.path.exists(cache_path):
+        try:
+            head = _SESSION.head(url, allow_redirects=True, timeout=download_script.HTTP_TIMEOUT)
+        except requests.RequestException:
+            head = None
+        if head is None or not head.ok:
+            return open(cache_path, "rb", buffering=ZIP_READ_BUFFER)
+        etag = head.headers.get("ETag")
+        remote_size = int(head.headers.get("Content-Length") or 0)
+        known_etag = _load_fetch_cache().get(url, {}).get("etag")
+        if etag and known_etag:
+            current = etag == known_etag
+        else:
+            current = not remote_size or remote_size == os.path.getsize(cache_path)
+        if current:
+            if etag and not known_etag:
+                _update_fetch_cache(url, {"etag": etag})
+            return open(cache_path, "rb", buffering=ZIP_READ_BUFFER)
+
+    archive = downloader(url)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    partial = cache_path + ".part"
+    size = archive.seek(0, os.SEEK_END)
+    archive.seek(0)
+    with open(partial, "wb", buffering=download_script.CHUNK_SIZE) as f:
+        download_script.preallocate(f, size)
+        shutil.copyfileobj(archive, f, length=download_script.CHUNK_SIZE)
+    os.replace(partial, cache_path)
+    _update_fetch_cache(url, {"etag": etag})
+    # Hand back the cached copy (a real path) rather than the temp download
+    archive.close()
+    return open(cache_path, "rb", buffering=ZIP_READ_BUFFER)
+
+class _ReadMap(mmap.mmap):
+    # ZipFile's shared-handle reader expects a file-like seekable()
+    def seekable(self):
+        return True
+
+@contextlib.contextmanager
+def _open_zip(path):
+    # Map the archive instead of reading it through a file buffer; the pages are usually
+    # still in the page cache from the download. ZipFile does not close what it was
+    # handed, so the mapping is closed here (before the caller removes the file).
+    with open(path, "rb") as f:
+        # mmap refuses empty files; report it the way the caller's empty-archive check does
+        if os.fstat(f.fileno()).st_size == 0:
+            raise Exception("Downloaded zip is empty")
+        with _ReadMap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            with zipfile.ZipFile(mm, 'r') as zip_ref:
+                yield zip_ref
+
+def _member_path(dest, name):
+    # Resolve an archive member under dest, refusing names that would escape it
+    target = os.path.normpath(os.path.join(dest, name))
+    if os.path.commonpath([os.path.abspath(dest), os.path.abspath(target)]) != os.path.abspath(dest):
+        raise Exception(f"Unsafe path in archive: {name}")
+    return target
+
+EXTRACT_COPY_BUFFER = 1024 * 1024
+
+# Fixed part of a zip local file header; the name and extra field lengths sit at 26..30
+ZIP_LOCAL_HEADER_SIZE = 30
+
+class _RawMemberReader:
+    # Compressed bytes of members, read past their local headers through handles of its
+    # own on the archive file (one per thread, so no shared seek position or lock) and
+    # located from the public ZipInfo.header_offset
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._handles = []
+        self._lock = threading.Lock()
+
+    def read(self, info):
+        fp = getattr(self._local, "fp", None)
+        if fp is None:
+            fp = self._local.fp = open(self.path, "rb")
+            with self._lock:
+                self._handles.append(fp)
+        fp.seek(info.header_offset)
+        header = fp.read(ZIP_LOCAL_HEADER_SIZE)
+        if header[:4] != b"PK\x03\x04":
+            raise zipfile.BadZipFile(f"Bad local header for file {info.filename!r}")
+        name_len, extra_len = struct.unpack("<HH", header[26:30])
+        fp.seek(info.header_offset + ZIP_LOCAL_HEADER_SIZE + name_len + extra_len)
+        return fp.read(info.compress_size)
+
+    def close(self):
+        for fp in self._handles:
+            fp.close()
+
+def _extract_member(zip_ref, info, target, verify_crc=True, raw=None):
+    # Inflate straight into the target with a 1 MiB copy buffer; parent directories
+    # are created by the caller.
+    if info.file_size == 0:
+        open(target, "wb").close()
+    elif raw and libdeflate and info.compress_type == zipfile.ZIP_DEFLATED and not info.flag_bits & 0x1:
+        data = libdeflate.deflate_decompress(raw.read(info), info.file_size)
+        if verify_crc and zlib.crc32(data) != info.CRC:
+            raise zipfile.BadZipFile(f"Bad CRC-32 for file {info.filename!r}")
+        with open(target, "wb") as dst:
+            dst.write(data)
+    else:
+        # ZipExtFile always checks the CRC; skipping it is left to the libdeflate path above
+        with zip_ref.open(info) as src, open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst, length=EXTRACT_COPY_BUFFER)
+    mode = (info.external_attr >> 16) & 0o777
+    if mode:
+        os.chmod(target, mode)
+
+def _parallel_extractall(zip_ref, dest, workers=None, strip_prefix=None, only=None, verify_crc=True, archive_path=None):
+    # ZipFile serializes raw reads on its shared handle and inflates outside that lock,
+    # so members can be extracted concurrently without reopening the archive per thread.
+    members = zip_ref.infolist()
+    if strip_prefix:
+        # Drop the archive's top-level folder so members land directly under dest.
+        # Only filename is rewritten; ZipFile validates against orig_filename.
+        prefix = strip_prefix.rstrip("/") + "/"
+        members = [info for info in members if info.filename.startswith(prefix) and info.filename != prefix]
+        for info in members:
+            info.filename = info.filename[len(prefix):]
+    if only is not None:
+        # Extract just the listed (post-strip) member names
+        members = [info for info in members if info.filename in only]
+    # Resolve (and validate) each target path once
+    files = []
+    dirs = {dest}
+    for info in members:
+        target = _member_path(dest, info.filename)
+        if info.is_dir():
+            dirs.add(target)
+        else:
+            files.append((info, target))
+            dirs.add(os.path.dirname(target))
+    # Create every unique directory up front, parents first, so workers only open files
+    for d in sorted(dirs):
+        os.makedirs(d, exist_ok=True)
+
+    # The libdeflate fast path needs the archive's path to read raw members on its own handles
+    raw = _RawMemberReader(archive_path) if archive_path and libdeflate else None
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers or BUILD_JOBS) as pool:
+            for _ in pool.map(lambda item: _extract_member(zip_ref, *item, verify_crc=verify_crc, raw=raw), files):
+                pass
+    finally:
+        if raw:
+            raw.close()
+
+def _force_rmtree(path, ignore_errors=False):
+    # On Windows, clear read-only bits (git checkouts, extracted archives) in one pass up
+    # front instead of letting rmtree fail and recover on every such file.
+    if os.name == 'nt':
+        for root, dirs, files in os.walk(path):
+            for name in dirs + files:
+                try:
+                    os.chmod(os.path.join(root, name), stat.S_IWRITE)
+                except OSError:
+                    pass
+    shutil.rmtree(path, ignore_errors=ignore_errors)
+
+def _swap_dir(src, dst):
+    # Move the previous install aside and rename the new tree into place;
+    # the stale copy is deleted on a background thread, off the install path.
+    old = _move_aside(dst)
+    os.replace(src, dst)
+    if old:
+        _rmtree_in_background(old)
+
+# ".old.<id>" trees this process is deleting right now; everything else is a leftover
+_PENDING_DELETES = set()
+_PENDING_LOCK = threading.Lock()
+
+def _sweep_moved_aside(path):
+    # Background deletes die with the process, so earlier runs can leave ".old.<id>"
+    # siblings behind (gigabytes for OpenCV); queue any that nobody is deleting
+    parent, base = os.path.split(os.path.abspath(path))
+    try:
+        names = os.listdir(parent)
+    except OSError:
+        return
+    prefix = base + ".old."
+    for name in names:
+        if name.startswith(prefix) or name == base + ".old":
+            leftover = os.path.join(parent, name)
+            with _PENDING_LOCK:
+                if leftover in _PENDING_DELETES:
+                    continue
+            _rmtree_in_background(leftover)
+
+def _move_aside(path):
+    # Rename path to a unique sibling ".old.<id>" name (one syscall) so it can be deleted
+    # later. Unique names keep a still-running background delete of an earlier copy from
+    # racing with this one.
+    _sweep_moved_aside(path)
+    if not os.path.exists(path):
+        return None
+    old = f"{path}.old.{uuid.uuid4().hex}"
+    os.replace(path, old)
+    return old
+
+def _rmtree_in_background(path):
+    path = os.path.abspath(path)
+    with _PENDING_LOCK:
+        _PENDING_DELETES.add(path)
+    def run():
+        try:
+            _force_rmtree(path, ignore_errors=True)
+        finally:
+            with _PENDING_LOCK:
+                _PENDING_DELETES.discard(path)
+    threading.Thread(target=run, daemon=True).start()
+
+def _remove_dir(path):
+    # Rename out of the way now; the file-by-file delete runs off this thread. Falls back
+    # to deleting in place when the rename is refused (e.g. a file is open on Windows).
+    try:
+        old = _move_aside(path)
+    except OSError:
+        _force_rmtree(path)
+        return
+    if old:
+        _rmtree_in_background(old)
+
+# Records which archive install_dir was extracted from
+EXTRACT_MANIFEST = ".manifest.json"
+
+def _extract_into(zip_ref, prefix, dest, only=None, manifest=None, verify_crc=True, archive_path=None):
+    # Extract the archive's top-level folder straight into a staging sibling of dest
+    # and rename it into place, rather than extracting elsewhere and moving the tree.
+    staging = dest + ".new"
+    if os.path.exists(staging):
+        _force_rmtree(staging)
+    _parallel_extractall(zip_ref, staging, strip_prefix=prefix, only=only, verify_crc=verify_crc, archive_path=archive_path)
+    if manifest:
+        with open(os.path.join(staging, EXTRACT_MANIFEST), 'wb') as f:
+            f.write(_json_dumps(manifest))
+    _swap_dir(staging, dest)
+
+def _archive_digest(archive):
+    digest = hashlib.sha256()
+    archive.seek(0)
+    while True:
+        chunk = archive.read(download_script.CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+    archive.seek(0)
+    return digest.hexdigest()
+
+def _extract_archive(archive, prefix, dest, only=None, progress_callback=None):
+    # Like _extract_into, but skipped when dest already holds this exact archive, e.g. when
+    # an install is retried after a failed build. The manifest is written before the swap,
+    # so it only exists once an extraction has fully completed. Only used for the pinned
+    # release archives of the built-in extensions (fetched over HTTPS and written to the
+    # cache via .part + rename), so the libdeflate path skips its per-member CRC check;
+    # members that fall back to zipfile are still verified.
+    digest = _archive_digest(archive)
+    manifest = {"sha256": digest, "prefix": prefix, "only": sorted(only) if only else None}
+    try:
+        with open(os.path.join(dest, EXTRACT_MANIFEST), 'rb') as f:
+            if _json_loads(f.read()) == manifest:
+                if progress_callback: progress_callback("Sources already extracted from this archive, skipping.")
+                return False
+    except (OSError, ValueError):
+        pass
+
+    # _cached_archive always hands back the file in the cache, so it has a path
+    archive_path = archive.name if isinstance(getattr(archive, "name", None), str) else None
+    with zipfile.ZipFile(archive, 'r') as zip_ref:
+        _extract_into(zip_ref, prefix, dest, only=only, manifest=manifest, verify_crc=False, archive_path=archive_path)
+    return True
+
+SCAN_MAX_DEPTH = 4
+
+_HEADER_EXTS = ('.h', '.hpp', '.hxx')
+_LIB_EXTS = ('.a', '.lib')
+# Never searched for headers or libraries (hidden/VCS folders start with '.')
+_SKIP_SCAN_DIRS = {'test', 'tests', 'docs', 'doc', 'examples', 'samples', 'benchmarks'}
+
+# How long a check_default_install() result is reused before hitting the disk again
+CHECK_CACHE_TTL = 2.0
+
+# Written into install_dir once an install has finished: the version plus the mtime of
+# the extension's canary header, so a later check is one read and one stat
+INSTALL_SENTINEL = ".installed.json"
+
+def _ttl_cached(check):
+    # Also consults the install sentinel first; the wrapped probe only runs for installs
+    # that predate it.
+    @functools.wraps(check)
+    def wrapper(self):
+        stamp, result = self._check_cache
+        now = time.monotonic()
+        if stamp is not None and now - stamp < CHECK_CACHE_TTL:
+            return result
+        result = self._sentinel_state()
+        if result is None:
+            result = check(self)
+        self._check_cache = (now, result)
+        return result
+    return wrapper
+
+def _find_first(root, relpaths, filename):
+    # Probe a short list of known layouts before falling back to a tree scan
+    for rel in relpaths:
+        candidate = os.path.join(root, rel)
+        if os.path.exists(os.path.join(candidate, filename)):
+            return candidate
+    return None
+
+def _scan_bounded_many(root, matches, max_depth=SCAN_MAX_DEPTH):
+    # Depth-limited walk using scandir; returns, for each match(), the first directory whose
+    # entries satisfy it (or None). The walk stops as soon as every match has a result.
+    found = [None] * len(matches)
+    stack = [(root, 0)]
+    while stack:
+        current, depth = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for i, match in enumerate(matches):
+            if found[i] is None and match(current, entries):
+                found[i] = current
+        if all(found):
+            break
+        if depth < max_depth:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False) and not entry.name.startswith('.') \
+                        and entry.name not in _SKIP_SCAN_DIRS:
+                    stack.append((entry.path, depth + 1))
+    return found
+
+def _scan_bounded(root, match, max_depth=SCAN_MAX_DEPTH):
+    return _scan_bounded_many(root, [match], max_depth)[0]
+
 class Extension:
     def __init__(self, name):
         self.name = name
         self.path = None
-        self.installed = False
+        self._installed = False
+        self._probed = False
+        self._check_cache = (None, False)
+
+    # The default-location probe runs on first access to `installed` rather than in
+    # __init__, so building the extension list does not touch the disk.
+    @property
+    def installed(self):
+        if not self._probed:
+            self._probed = True
+            self._probe_default_install()
+        return self._installed
+
+    @installed.setter
+    def installed(self, value):
+        self._probed = True
+        self._installed = value
+
+    def _probe_default_install(self):
+        pass
+
+    def invalidate_cache(self):
+        self._check_cache = (None, False)
+
+    # Header (relative to install_dir) whose mtime is recorded in the install sentinel
+    SENTINEL_CANARY = None
+
+    def _sentinel_canary(self):
+        return self.SENTINEL_CANARY
+
+    def _write_install_sentinel(self):
+        marker = {"version": self.version}
+        canary = self._sentinel_canary()
+        if canary:
+            try:
+                marker["canary_mtime"] = os.stat(os.path.join(self.install_dir, canary)).st_mtime_ns
+                marker["canary"] = canary
+            except OSError:
+                # Unexpected layout: the sentinel still records the version and later
+                # checks fall back to the full probe
+                pass
+        _write_json(os.path.join(self.install_dir, INSTALL_SENTINEL), marker)
+
+    def _sentinel_state(self):
+        # True/False from the sentinel, or None when there is no usable sentinel
+        try:
+            with open(os.path.join(self.install_dir, INSTALL_SENTINEL), 'rb') as f:
+                marker = _json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if marker.get("version") != self.version:
+            return False
+        canary = marker.get("canary", self.SENTINEL_CANARY)
+        if canary:
+            if "canary_mtime" not in marker:
+                return None
+            try:
+                mtime = os.stat(os.path.join(self.install_dir, canary)).st_mtime_ns
+            except OSError:
+                return False
+            return mtime == marker.get("canary_mtime")
+        return True
 
     def is_installed(self):
         raise NotImplementedError
@@ -41,7 +644,119 @@ class Extension:
     def get_link_flags(self):
         raise NotImplementedError
 
+    # Shared install flow for extensions that download a GitHub source archive
+    # into install_dir. Subclasses provide check_default_install() and
+    # _apply_default_paths(), and build anything they need in _post_extract().
+    display_name = None
+    header_only = False
+
+    def _label(self):
+        return self.display_name or self.name
+
+    def _apply_default_paths(self):
+        pass
+
+    def _post_extract(self, progress_callback=None):
+        pass
+
+    def _download_to(self, url, path, headers=None):
+        # Copy the raw body to disk in 1 MiB reads; the file is unbuffered so each
+        # chunk goes straight to the kernel, and is hashed on the way through.
+        # Returns (response headers, sha256 hex digest), or None when a conditional
+        # request came back 304 and path was left untouched.
+        with _SESSION.get(url, stream=True, headers=headers, timeout=download_script.HTTP_TIMEOUT) as response:
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            response.raw.decode_content = True
+            partial = path + ".part"
+            digest = hashlib.sha256()
+            with open(partial, "wb", buffering=0) as f:
+                download_script.preallocate(f, int(response.headers.get("Content-Length") or 0))
+                while True:
+                    chunk = response.raw.read(download_script.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    digest.update(chunk)
+                f.truncate(f.tell())
+            os.replace(partial, path)
+            return response.headers, digest.hexdigest()
+
+    def _default_is_installed(self):
+        if self.path == self.install_dir:
+            if not self.check_default_install():
+                self.installed = False
+                self.path = None
+        elif self.path: # manual path
+             if not os.path.isdir(self.path):
+                 self.installed = False
+                 self.path = None
+        else: # not installed, check defaulted
+            if self.check_default_install():
+                self.path = self.install_dir
+                self.installed = True
+                self._apply_default_paths()
+        return self.installed
+
+    def _download_and_extract(self, progress_callback=None):
+        os.makedirs(EXTENSIONS_DIR, exist_ok=True)
+
+        # 1. Download
+        if progress_callback: progress_callback(f"Downloading {self.zip_filename}...")
+        archive = _cached_archive(self.download_url, self.zip_filename)
+
+        # 2. Extract
+        if progress_callback: progress_callback(f"Extracting {self._label()} source...")
+        with archive:
+            _extract_archive(archive, self.extract_folder_name, self.install_dir, progress_callback=progress_callback)
+
+    def _default_install(self, progress_callback=None):
+        self.invalidate_cache()
+        if self.installed:
+            if progress_callback: progress_callback(f"{self._label()} already installed.")
+            return
+
+        try:
+            self._download_and_extract(progress_callback)
+            with _BUILD_LOCK:
+                self._post_extract(progress_callback)
+            self._write_install_sentinel()
+
+            suffix = " (Header-only)" if self.header_only else ""
+            if progress_callback: progress_callback(f"{self._label()} installed successfully{suffix}.")
+            self.installed = True
+            self.invalidate_cache()
+            self.path = self.install_dir
+            self._apply_default_paths()
+
+        except Exception as e:
+            if progress_callback: progress_callback(f"Error: {e}")
+            raise e
+
+    def _default_uninstall(self, progress_callback=None):
+        self.invalidate_cache()
+        if not self.installed:
+            if progress_callback: progress_callback(f"{self._label()} is not installed.")
+            return
+        
+        try:
+            if progress_callback: progress_callback(f"Uninstalling {self._label()}...")
+            _remove_dir(self.install_dir)
+            
+            self.installed = False
+            self.invalidate_cache()
+            self.path = None
+            self.include_path = None
+            self.lib_path = None
+            if progress_callback: progress_callback(f"{self._label()} uninstalled successfully.")
+        except Exception as e:
+            if progress_callback: progress_callback(f"Error uninstalling {self._label()}: {e}")
+            raise e
+
 class RaylibExtension(Extension):
+    SENTINEL_CANARY = os.path.join("src", "raylib.h")
+
     def __init__(self):
         super().__init__("raylib")
         self.version = "5.5"
@@ -53,6 +768,7 @@ class RaylibExtension(Extension):
         self.include_path = None
         self.lib_path = None
 
+    def _probe_default_install(self):
         # Check if already installed in default location
         if self.check_default_install():
             self.path = self.install_dir
@@ -75,6 +791,7 @@ class RaylibExtension(Extension):
                 self.set_manual_path(self.install_dir)
         return self.installed
 
+    @_ttl_cached
     def check_default_install(self):
         # Basic check: look for src/raylib.h and src/libraylib.a
         return os.path.exists(os.path.join(self.install_dir, "src", "raylib.h")) and \
@@ -117,18 +834,12 @@ class RaylibExtension(Extension):
              
         return False
 
-    def _on_rm_error(self, func, path, exc_info):
-        # Error handler for shutil.rmtree to remove read-only files
-        os.chmod(path, stat.S_IWRITE)
-        func(path)
-
     def install(self, progress_callback=None):
         if self.installed:
             if progress_callback: progress_callback("Raylib already installed.")
             return
 
-        if not os.path.exists(EXTENSIONS_DIR):
-            os.makedirs(EXTENSIONS_DIR)
+        os.makedirs(EXTENSIONS_DIR, exist_ok=True)
 
         try:
             # Check for make
@@ -140,64 +851,37 @@ class RaylibExtension(Extension):
 
             # 1. Download
             if progress_callback: progress_callback(f"Downloading {self.zip_filename}...")
-            zip_path = os.path.join(EXTENSIONS_DIR, self.zip_filename)
-            
-            # Use stream=True to avoid reading large file into memory
-            response = requests.get(self.download_url, stream=True)
-            response.raise_for_status()
-            
-            with open(zip_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            archive = _cached_archive(self.download_url, self.zip_filename)
 
             # 2. Extract
             if progress_callback: progress_callback("Extracting...")
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(EXTENSIONS_DIR)
-            
-            # Rename/Move
-            extracted_path = os.path.join(EXTENSIONS_DIR, self.extract_folder_name)
-            
-            # Robust removal of existing dir
-            if os.path.exists(self.install_dir):
-                if progress_callback: progress_callback("Removing old version...")
-                shutil.rmtree(self.install_dir, onerror=self._on_rm_error)
-                time.sleep(0.5)
-
-            # Robust move with retry
-            max_retries = 3
-            for i in range(max_retries):
-                try:
-                    if progress_callback: progress_callback("Moving files...")
-                    shutil.move(extracted_path, self.install_dir)
-                    break 
-                except Exception as e:
-                    if i == max_retries - 1:
-                        raise e
-                    if progress_callback: progress_callback(f"Move failed (attempt {i+1}), retrying...")
-                    time.sleep(1.0)
-            
-            try:
-                os.remove(zip_path)
-            except:
-                pass
+            with archive:
+                _extract_archive(archive, self.extract_folder_name, self.install_dir, progress_callback=progress_callback)
 
             # 3. Compile
             if progress_callback: progress_callback("Compiling Raylib (this may take a while)...")
             src_dir = os.path.join(self.install_dir, "src")
             
-            # We use subprocess with cwd
-            cmd = [make_cmd, "PLATFORM=PLATFORM_DESKTOP", "RAYLIB_LIBTYPE=STATIC"]
+            # We use subprocess with cwd. raylib's Makefile assigns CFLAGS itself, so extra
+            # flags go through its CUSTOM_CFLAGS hook; -pipe skips the cc1 -> as temp files.
+            cmd = [make_cmd, f"-j{BUILD_JOBS}", "PLATFORM=PLATFORM_DESKTOP", "RAYLIB_LIBTYPE=STATIC", "CUSTOM_CFLAGS=-pipe"]
+            launcher = _compiler_launcher()
+            if launcher:
+                cc = "gcc" if shutil.which("gcc") else "clang"
+                cmd.append(f"CC={launcher} {cc}")
             
             # Capture output
-            result = subprocess.run(cmd, cwd=src_dir, capture_output=True, text=True)
-            if result.returncode != 0:
-                if progress_callback: progress_callback(f"Compilation failed:\n{result.stderr}")
-                raise Exception(f"Raylib compilation failed: {result.stderr}")
+            with _BUILD_LOCK:
+                returncode, output = _run_streamed(cmd, cwd=src_dir, progress_callback=progress_callback)
+            if returncode != 0:
+                if progress_callback: progress_callback(f"Compilation failed:\n{output}")
+                raise Exception(f"Raylib compilation failed: {output}")
 
+            self._write_install_sentinel()
             if progress_callback: progress_callback("Raylib installed successfully.")
             self.path = self.install_dir
             self.installed = True
+            self.invalidate_cache()
             self.include_path = src_dir
             self.lib_path = src_dir
 
@@ -212,10 +896,10 @@ class RaylibExtension(Extension):
         
         try:
             if progress_callback: progress_callback("Uninstalling Raylib...")
-            if os.path.exists(self.install_dir):
-                shutil.rmtree(self.install_dir, onerror=self._on_rm_error)
+            _remove_dir(self.install_dir)
             
             self.installed = False
+            self.invalidate_cache()
             self.path = None
             self.include_path = None
             self.lib_path = None
@@ -233,16 +917,19 @@ class RaylibExtension(Extension):
     def get_lib_path(self):
         return self.lib_path
 
+    # -lraylib -lgdi32 -lwinmm etc for windows
+    _LINK_FLAGS_NT = ("-lraylib", "-lgdi32", "-lwinmm", "-lopengl32")
+    _LINK_FLAGS_POSIX = ("-lraylib", "-lGL", "-lm", "-lpthread", "-ldl", "-lrt", "-lX11")
+
     def get_link_flags(self):
-        # -lraylib -lgdi32 -lwinmm etc for windows
-        flags = ["-lraylib"]
-        if os.name == 'nt':
-            flags.extend(["-lgdi32", "-lwinmm", "-lopengl32"])
-        else:
-            flags.extend(["-lGL", "-lm", "-lpthread", "-ldl", "-lrt", "-lX11"])
-        return flags
+        return list(self._LINK_FLAGS_NT if os.name == 'nt' else self._LINK_FLAGS_POSIX)
+
+# libopencv_core4130.a / opencv_core4130.lib -> ("opencv_core4130", "core")
+_OPENCV_LIB_RE = re.compile(r'^(?:lib)?(opencv_([a-z0-9_]+?)\d*)\.(?:a|lib)$')
 
 class OpenCVExtension(Extension):
+    SENTINEL_CANARY = os.path.join("build", "install", "include", "opencv4", "opencv2", "opencv.hpp")
+
     def __init__(self):
         super().__init__("opencv")
         self.version = "4.13.0"
@@ -253,7 +940,16 @@ class OpenCVExtension(Extension):
         
         self.include_path = None
         self.lib_path = None
+        self._link_cache = None
 
+    def _sentinel_canary(self):
+        # MinGW/Windows installs put the headers in include/opencv2, others in include/opencv4/opencv2
+        found = _find_first(self.install_dir, self.OPENCV_INCLUDE_CANDIDATES, "opencv.hpp")
+        if found:
+            return os.path.join(os.path.relpath(found, self.install_dir), "opencv.hpp")
+        return self.SENTINEL_CANARY
+
+    def _probe_default_install(self):
         if self.check_default_install():
             self.path = self.install_dir
             self.installed = True
@@ -286,88 +982,93 @@ class OpenCVExtension(Extension):
                       self.lib_path = os.path.join(self.install_dir, "build", "lib")
         return self.installed
 
+    @_ttl_cached
     def check_default_install(self):
         # Check for build/install folder
         install_p = os.path.join(self.install_dir, "build", "install")
         return os.path.exists(os.path.join(install_p, "include", "opencv4", "opencv2", "opencv.hpp"))
 
+    OPENCV_INCLUDE_CANDIDATES = (
+        os.path.join("include", "opencv4", "opencv2"),
+        os.path.join("build", "install", "include", "opencv4", "opencv2"),
+        os.path.join("build", "install", "include", "opencv2"),
+        os.path.join("include", "opencv2"),
+        "opencv2",
+    )
+    OPENCV_LIB_CANDIDATES = (
+        os.path.join("build", "install", "x64", "mingw", "lib"),
+        os.path.join("build", "install", "lib"),
+        os.path.join("build", "lib"),
+        os.path.join("x64", "mingw", "lib"),
+        "lib",
+    )
+
+    @staticmethod
+    def _has_core_lib(entries):
+        return any(e.name.startswith("libopencv_core") and e.name.endswith((".a", ".lib")) for e in entries)
+
     def set_manual_path(self, path):
          if not os.path.isdir(path): return False
-         # Logic to find opencv paths in a custom directory is complex due to variations
-         # Search for include
-         found_inc = False
-         for root, dirs, files in os.walk(path):
-             if "opencv2" in dirs and "opencv.hpp" in files: 
-                  # This likely is opencv2/opencv.hpp, so root is include/opencv4 or include
-                  # But we need the root include dir that 'contains' opencv2 or opencv4
-                  pass
-             if "opencv.hpp" in files:
-                  # Found it. verify if parent is opencv2
-                  if os.path.basename(root) == "opencv2":
-                       # The include path is the parent of 'opencv2' (if #include <opencv2/...>)
-                       # or parent of parent if (#include <opencv4/...>)
-                       self.include_path = os.path.dirname(root) # include/
-                       found_inc = True
-                       break
-         
-         if found_inc:
-             self.path = path
-             self.installed = True
-             # Try to find lib
-             self.lib_path = self.include_path # fallback
-             for root, dirs, files in os.walk(path):
-                 if any(f.endswith(".a") or f.endswith(".lib") for f in files):
-                     if "libopencv_core" in " ".join(files):
-                         self.lib_path = root
-                         break
-             return True
-         return False
+         has_lib = lambda d, entries: self._has_core_lib(entries)
+         # Known layouts first; only scan the tree (bounded depth) if none match
+         scanned_lib = None
+         scanned = False
+         header_dir = _find_first(path, self.OPENCV_INCLUDE_CANDIDATES, "opencv.hpp")
+         if not header_dir:
+             # One walk looks for the headers and the libraries together
+             header_dir, scanned_lib = _scan_bounded_many(path, [
+                 lambda d, entries: os.path.basename(d) == "opencv2" and any(e.name == "opencv.hpp" for e in entries),
+                 has_lib,
+             ])
+             scanned = True
+         if not header_dir:
+             return False
+
+         # The include path is the parent of 'opencv2' (if #include <opencv2/...>)
+         self.include_path = os.path.dirname(header_dir)
+         self.path = path
+         self.installed = True
+
+         # Try to find lib
+         self.lib_path = self.include_path # fallback
+         for rel in self.OPENCV_LIB_CANDIDATES:
+             lib_dir = os.path.join(path, rel)
+             try:
+                 with os.scandir(lib_dir) as it:
+                     if self._has_core_lib(it):
+                         self.lib_path = lib_dir
+                         return True
+             except OSError:
+                 continue
+         lib_dir = scanned_lib if scanned else _scan_bounded(path, has_lib)
+         if lib_dir:
+             self.lib_path = lib_dir
+         return True
 
     def install(self, progress_callback=None):
         if self.installed:
             if progress_callback: progress_callback("OpenCV already installed.")
             return
 
-        if not os.path.exists(EXTENSIONS_DIR):
-            os.makedirs(EXTENSIONS_DIR)
+        os.makedirs(EXTENSIONS_DIR, exist_ok=True)
 
         try:
             # 1. Download
             if progress_callback: progress_callback(f"Downloading {self.zip_filename}...")
-            zip_path = os.path.join(EXTENSIONS_DIR, self.zip_filename)
-            
-            response = requests.get(self.download_url, stream=True)
-            response.raise_for_status()
-
-            with open(zip_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            archive = _cached_archive(self.download_url, self.zip_filename, _download_archive_ranged)
 
             # 2. Extract
             if progress_callback: progress_callback("Extracting OpenCV source...")
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(EXTENSIONS_DIR)
-            
-            extracted_path = os.path.join(EXTENSIONS_DIR, self.extract_folder_name)
-            
-            # Remove old
-            if os.path.exists(self.install_dir):
-                if progress_callback: progress_callback("Removing old version...")
-                shutil.rmtree(self.install_dir, onerror=self._on_rm_error)
-                time.sleep(0.5)
-
-            # Move
-            shutil.move(extracted_path, self.install_dir)
-            try: os.remove(zip_path); 
-            except: pass
+            with archive:
+                _extract_archive(archive, self.extract_folder_name, self.install_dir, progress_callback=progress_callback)
 
             # 3. Build with CMake
             if progress_callback: progress_callback("Configuring OpenCV with CMake...")
             build_dir = os.path.join(self.install_dir, "build")
-            if not os.path.exists(build_dir): os.makedirs(build_dir)
+            os.makedirs(build_dir, exist_ok=True)
             
             # Configure
-            # We force MinGW Makefiles if on Windows to ensure compatibility with Cmpile's likely environment
+            # Ninja if available, else MinGW Makefiles on Windows to ensure compatibility with Cmpile's likely environment
             # effectively 'cmake -S .. -B . -G "MinGW Makefiles" -DBUILD_SHARED_LIBS=OFF -DBUILD_TESTS=OFF -DBUILD_PERF_TESTS=OFF'
             cmake_args = [
                 "cmake", "-S", "..", "-B", ".",
@@ -377,36 +1078,47 @@ class OpenCVExtension(Extension):
                 "-DBUILD_EXAMPLES=OFF",
                 "-DBUILD_JAVA=OFF",
                 "-DBUILD_PYTHON=OFF",
+                # Only the modules get_link_flags() links (their dependencies are pulled in by CMake)
+                f"-DBUILD_LIST={','.join(self.OPENCV_LINK_ORDER)}",
+                "-DBUILD_opencv_apps=OFF",
+                "-DBUILD_opencv_world=OFF",
+                "-DWITH_IPP=OFF",
+                "-DWITH_TBB=OFF",
+                "-DWITH_OPENCL=OFF",
+                "-DCV_TRACE=OFF",
                 "-DCMAKE_INSTALL_PREFIX=./install"
             ]
             
-            if os.name == 'nt' and shutil.which("mingw32-make"):
-                 cmake_args.extend(["-G", "MinGW Makefiles"])
+            cmake_args.extend(_cmake_generator_args())
+            cmake_args.extend(_compiler_launcher_args())
 
-            result = subprocess.run(cmake_args, cwd=build_dir, capture_output=True, text=True)
-            if result.returncode != 0:
-                 raise Exception(f"CMake Configuration Failed:\n{result.stderr}")
+            returncode, output = _run_streamed(cmake_args, cwd=build_dir, progress_callback=progress_callback)
+            if returncode != 0:
+                 raise Exception(f"CMake Configuration Failed:\n{output}")
 
             # Build
             if progress_callback: progress_callback("Building OpenCV (This WILL take 10-30 minutes)...")
-            build_cmd = ["cmake", "--build", ".", "--config", "Release", "--target", "install"]
+            build_cmd = _cmake_build_cmd(target="install")
             
-            # This is the long part
-            # Streaming output strictly is hard with subprocess.run capture_output, 
-            # ideally we just let it run or use Popen to stream updates.
-            # For simplicity/stability we wait, but user gets no partial progress bar for the compilation itself.
-            result = subprocess.run(build_cmd, cwd=build_dir, capture_output=True, text=True)
-            if result.returncode != 0:
-                 raise Exception(f"OpenCV Build Failed:\n{result.stderr}")
+            # This is the long part; compiler output is streamed through progress_callback
+            with _BUILD_LOCK:
+                returncode, output = _run_streamed(build_cmd, cwd=build_dir, progress_callback=progress_callback)
+            if returncode != 0:
+                 raise Exception(f"OpenCV Build Failed:\n{output}")
 
+            self._write_install_sentinel()
             if progress_callback: progress_callback("OpenCV installed successfully.")
             self.installed = True
+            self.invalidate_cache()
             self.path = self.install_dir
             self.include_path = os.path.join(build_dir, "install", "include")
             # Lib path - try to find where .a files went
             self.lib_path = os.path.join(build_dir, "install", "x64", "mingw", "lib")
             if not os.path.exists(self.lib_path):
                 self.lib_path = os.path.join(build_dir, "install", "lib")
+            # Resolve the library names now so the first link does not pay for the scan
+            if os.path.exists(self.lib_path):
+                self._discover_libs(self.lib_path)
 
         except Exception as e:
             if progress_callback: progress_callback(f"Error: {e}")
@@ -419,10 +1131,10 @@ class OpenCVExtension(Extension):
         
         try:
             if progress_callback: progress_callback("Uninstalling OpenCV...")
-            if os.path.exists(self.install_dir):
-                shutil.rmtree(self.install_dir, onerror=self._on_rm_error)
+            _remove_dir(self.install_dir)
             
             self.installed = False
+            self.invalidate_cache()
             self.path = None
             self.include_path = None
             self.lib_path = None
@@ -434,16 +1146,34 @@ class OpenCVExtension(Extension):
     def get_version(self):
         return f"v{self.version}"
 
-    def _on_rm_error(self, func, path, exc_info):
-        os.chmod(path, stat.S_IWRITE)
-        func(path)
-
     def get_include_path(self):
         return self.include_path
 
     def get_lib_path(self):
         return self.lib_path
 
+    def invalidate_cache(self):
+        super().invalidate_cache()
+        self._link_cache = None
+
+    # Modules linked by default, in link order (dependents before their dependencies)
+    OPENCV_LINK_ORDER = ("highgui", "imgcodecs", "videoio", "imgproc", "core")
+    _OPENCV_LINK_MODULES = frozenset(OPENCV_LINK_ORDER)
+
+    def _discover_libs(self, lib_path):
+        # One scandir pass, cached per lib_path: libopencv_core4130.a -> -lopencv_core4130
+        if self._link_cache and self._link_cache[0] == lib_path:
+            return self._link_cache[1]
+        by_module = {}
+        with os.scandir(lib_path) as it:
+            for entry in it:
+                m = _OPENCV_LIB_RE.match(entry.name)
+                if m and m.group(2) in self._OPENCV_LINK_MODULES and entry.is_file():
+                    by_module.setdefault(m.group(2), set()).add(f"-l{m.group(1)}")
+        found_libs = tuple(flag for p in self.OPENCV_LINK_ORDER for flag in sorted(by_module.get(p, ())))
+        self._link_cache = (lib_path, found_libs)
+        return found_libs
+
     def get_link_flags(self):
         # OpenCV requires many libs
         # Just linking core, imgproc, imgcodecs, highgui usually enough for basic stuff
@@ -454,31 +1184,21 @@ class OpenCVExtension(Extension):
         libs = ["-lopencv_highgui4100", "-lopencv_imgcodecs4100", "-lopencv_imgproc4100", "-lopencv_core4100"]
         # If headers are different version, libs names change.
         # We need to scan lib_path for actual names?
-        if self.lib_path and os.path.exists(self.lib_path):
-             files = os.listdir(self.lib_path)
-             # Basic auto-discovery of main modules
-             found_libs = []
-             priority = ["highgui", "imgcodecs", "videoio", "imgproc", "core"]
-             # We need to strip lib prefix and extension
-             for p in priority:
-                  for f in files:
-                       if p in f and (f.endswith(".a") or f.endswith(".lib")) and "main" not in f:
-                            # libopencv_core4100.a -> -lopencv_core4100
-                            name = os.path.splitext(f)[0]
-                            if name.startswith("lib"): name = name[3:]
-                            flag = f"-l{name}"
-                            if flag not in found_libs:
-                                 found_libs.append(flag)
-             
-             # Add others not in priority but present? 
-             # For now return the priority list + extensive system libs
-             libs = found_libs
+        if self.lib_path:
+             try:
+                 libs = list(self._discover_libs(self.lib_path))
+             except OSError:
+                 pass
         
         if os.name == 'nt':
              libs.extend(["-lgdi32", "-lcomdlg32", "-lole32", "-luuid"])
         return libs
 
 class MiniaudioExtension(Extension):
+    # Single-header library: the rest of the repo (tests, examples, bindings) is never used
+    KEEP_FILES = {"miniaudio.h", "miniaudio.c", "LICENSE", "README.md"}
+    SENTINEL_CANARY = "miniaudio.h"
+
     def __init__(self):
         super().__init__("miniaudio")
         self.version = "0.11.23"
@@ -486,7 +1206,8 @@ class MiniaudioExtension(Extension):
         self.zip_filename = f"miniaudio-{self.version}.zip"
         self.extract_folder_name = f"miniaudio-{self.version}"
         self.install_dir = os.path.join(EXTENSIONS_DIR, "miniaudio")
-        
+
+    def _probe_default_install(self):
         if self.is_installed():
             self.path = self.install_dir
             self.installed = True
@@ -502,6 +1223,7 @@ class MiniaudioExtension(Extension):
                 self.installed = True
         return self.installed
 
+    @_ttl_cached
     def check_default_install(self):
         return os.path.exists(os.path.join(self.install_dir, "miniaudio.h"))
 
@@ -510,37 +1232,21 @@ class MiniaudioExtension(Extension):
             if progress_callback: progress_callback("miniaudio already installed.")
             return
 
-        if not os.path.exists(EXTENSIONS_DIR):
-            os.makedirs(EXTENSIONS_DIR)
+        os.makedirs(EXTENSIONS_DIR, exist_ok=True)
 
         try:
             if progress_callback: progress_callback(f"Downloading {self.zip_filename}...")
-            zip_path = os.path.join(EXTENSIONS_DIR, self.zip_filename)
-            
-            response = requests.get(self.download_url, stream=True)
-            response.raise_for_status()
-            
-            with open(zip_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            archive = _cached_archive(self.download_url, self.zip_filename)
 
             if progress_callback: progress_callback("Extracting...")
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(EXTENSIONS_DIR)
-            
-            extracted_path = os.path.join(EXTENSIONS_DIR, self.extract_folder_name)
-            
-            if os.path.exists(self.install_dir):
-                shutil.rmtree(self.install_dir, onerror=self._on_rm_error)
-            
-            shutil.move(extracted_path, self.install_dir)
-            
-            try: os.remove(zip_path)
-            except: pass
+            with archive:
+                _extract_archive(archive, self.extract_folder_name, self.install_dir, only=self.KEEP_FILES, progress_callback=progress_callback)
 
+            self._write_install_sentinel()
             if progress_callback: progress_callback("miniaudio installed successfully.")
             self.path = self.install_dir
             self.installed = True
+            self.invalidate_cache()
 
         except Exception as e:
             if progress_callback: progress_callback(f"Error: {e}")
@@ -553,10 +1259,10 @@ class MiniaudioExtension(Extension):
         
         try:
             if progress_callback: progress_callback("Uninstalling miniaudio...")
-            if os.path.exists(self.install_dir):
-                shutil.rmtree(self.install_dir, onerror=self._on_rm_error)
+            _remove_dir(self.install_dir)
             
             self.installed = False
+            self.invalidate_cache()
             self.path = None
             if progress_callback: progress_callback("miniaudio uninstalled successfully.")
         except Exception as e:
@@ -566,10 +1272,6 @@ class MiniaudioExtension(Extension):
     def get_version(self):
         return f"v{self.version}"
 
-    def _on_rm_error(self, func, path, exc_info):
-        os.chmod(path, stat.S_IWRITE)
-        func(path)
-
     def get_include_path(self):
         return self.install_dir
 
@@ -582,6 +1284,8 @@ class MiniaudioExtension(Extension):
         return ["-lpthread", "-lm", "-ldl"]
 
 class TinyXMLExtension(Extension):
+    SENTINEL_CANARY = "tinyxml2.h"
+
     def __init__(self):
         super().__init__("tinyxml")
         self.version = "11.0.0"
@@ -593,6 +1297,7 @@ class TinyXMLExtension(Extension):
         self.include_path = None
         self.lib_path = None
 
+    def _probe_default_install(self):
         if self.check_default_install():
             self.path = self.install_dir
             self.installed = True
@@ -619,6 +1324,7 @@ class TinyXMLExtension(Extension):
                 self.lib_path = os.path.join(self.install_dir, "build")
         return self.installed
 
+    @_ttl_cached
     def check_default_install(self):
         # Look for tinyxml2.h in install_dir and libtinyxml2.a in build
         # Windows might have .lib instead of .a
@@ -631,40 +1337,22 @@ class TinyXMLExtension(Extension):
             if progress_callback: progress_callback("TinyXML2 already installed.")
             return
 
-        if not os.path.exists(EXTENSIONS_DIR):
-            os.makedirs(EXTENSIONS_DIR)
+        os.makedirs(EXTENSIONS_DIR, exist_ok=True)
 
         try:
             # 1. Download
             if progress_callback: progress_callback(f"Downloading {self.zip_filename}...")
-            zip_path = os.path.join(EXTENSIONS_DIR, self.zip_filename)
-            
-            response = requests.get(self.download_url, stream=True)
-            response.raise_for_status()
-            
-            with open(zip_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            archive = _cached_archive(self.download_url, self.zip_filename)
 
             # 2. Extract
             if progress_callback: progress_callback("Extracting TinyXML2 source...")
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(EXTENSIONS_DIR)
-            
-            extracted_path = os.path.join(EXTENSIONS_DIR, self.extract_folder_name)
-            
-            if os.path.exists(self.install_dir):
-                shutil.rmtree(self.install_dir, onerror=self._on_rm_error)
-            
-            shutil.move(extracted_path, self.install_dir)
-            
-            try: os.remove(zip_path)
-            except: pass
+            with archive:
+                _extract_archive(archive, self.extract_folder_name, self.install_dir, progress_callback=progress_callback)
 
             # 3. Build with CMake
             if progress_callback: progress_callback("Configuring TinyXML2 with CMake...")
             build_dir = os.path.join(self.install_dir, "build")
-            if not os.path.exists(build_dir): os.makedirs(build_dir)
+            os.makedirs(build_dir, exist_ok=True)
             
             # We use common CMake flags for static build
             cmake_args = [
@@ -673,23 +1361,26 @@ class TinyXMLExtension(Extension):
                 "-DBUILD_TESTS=OFF"
             ]
             
-            if os.name == 'nt' and shutil.which("mingw32-make"):
-                 cmake_args.extend(["-G", "MinGW Makefiles"])
+            cmake_args.extend(_cmake_generator_args())
+            cmake_args.extend(_compiler_launcher_args())
 
-            result = subprocess.run(cmake_args, cwd=build_dir, capture_output=True, text=True)
-            if result.returncode != 0:
-                 raise Exception(f"TinyXML2 CMake Configuration Failed:\n{result.stderr}")
+            returncode, output = _run_streamed(cmake_args, cwd=build_dir, progress_callback=progress_callback)
+            if returncode != 0:
+                 raise Exception(f"TinyXML2 CMake Configuration Failed:\n{output}")
 
             # Build
             if progress_callback: progress_callback("Building TinyXML2...")
-            build_cmd = ["cmake", "--build", ".", "--config", "Release"]
+            build_cmd = _cmake_build_cmd()
             
-            result = subprocess.run(build_cmd, cwd=build_dir, capture_output=True, text=True)
-            if result.returncode != 0:
-                 raise Exception(f"TinyXML2 Build Failed:\n{result.stderr}")
+            with _BUILD_LOCK:
+                returncode, output = _run_streamed(build_cmd, cwd=build_dir, progress_callback=progress_callback)
+            if returncode != 0:
+                 raise Exception(f"TinyXML2 Build Failed:\n{output}")
 
+            self._write_install_sentinel()
             if progress_callback: progress_callback("TinyXML2 installed successfully.")
             self.installed = True
+            self.invalidate_cache()
             self.path = self.install_dir
             self.include_path = self.install_dir
             self.lib_path = build_dir
@@ -705,10 +1396,10 @@ class TinyXMLExtension(Extension):
         
         try:
             if progress_callback: progress_callback("Uninstalling TinyXML2...")
-            if os.path.exists(self.install_dir):
-                shutil.rmtree(self.install_dir, onerror=self._on_rm_error)
+            _remove_dir(self.install_dir)
             
             self.installed = False
+            self.invalidate_cache()
             self.path = None
             self.include_path = None
             self.lib_path = None
@@ -720,10 +1411,6 @@ class TinyXMLExtension(Extension):
     def get_version(self):
         return f"v{self.version}"
 
-    def _on_rm_error(self, func, path, exc_info):
-        os.chmod(path, stat.S_IWRITE)
-        func(path)
-
     def get_include_path(self):
         return self.include_path
 
@@ -734,6 +1421,9 @@ class TinyXMLExtension(Extension):
         return ["-ltinyxml2"]
 
 class MinizExtension(Extension):
+    display_name = "miniz"
+    SENTINEL_CANARY = "miniz.h"
+
     def __init__(self):
         super().__init__("miniz")
         self.version = "3.1.0"
@@ -745,135 +1435,120 @@ class MinizExtension(Extension):
         self.include_path = None
         self.lib_path = None
 
+    def _probe_default_install(self):
         if self.check_default_install():
             self.path = self.install_dir
             self.installed = True
-            self.include_path = self.install_dir
-            self.lib_path = os.path.join(self.install_dir, "build")
-        else:
-            self.path = None
-            self.installed = False
+            self._apply_default_paths()
 
     def is_installed(self):
-        if self.path == self.install_dir:
-            if not self.check_default_install():
-                self.installed = False
-                self.path = None
-        elif self.path: # manual path
-             if not os.path.isdir(self.path):
-                 self.installed = False
-                 self.path = None
-        else: # not installed, check defaulted
-            if self.check_default_install():
-                self.path = self.install_dir
-                self.installed = True
-                self.include_path = self.install_dir
-                self.lib_path = os.path.join(self.install_dir, "build")
-        return self.installed
+        return self._default_is_installed()
 
+    @_ttl_cached
     def check_default_install(self):
-        return os.path.exists(os.path.join(self.install_dir, "miniz.h")) and \
-               (os.path.exists(os.path.join(self.install_dir, "build", "libminiz.a")) or \
-                os.path.exists(os.path.join(self.install_dir, "build", "miniz.lib")))
+        if not os.path.exists(os.path.join(self.install_dir, "miniz.h")):
+            return False
+        # One directory read covers both the MinGW and MSVC library names
+        try:
+            with os.scandir(os.path.join(self.install_dir, "build")) as it:
+                entries = {e.name for e in it}
+        except OSError:
+            return False
+        return "libminiz.a" in entries or "miniz.lib" in entries
 
-    def install(self, progress_callback=None):
-        if self.installed:
-            if progress_callback: progress_callback("miniz already installed.")
-            return
+    def _apply_default_paths(self):
+        self.include_path = self.install_dir
+        self.lib_path = os.path.join(self.install_dir, "build")
 
-        if not os.path.exists(EXTENSIONS_DIR):
-            os.makedirs(EXTENSIONS_DIR)
+    def _post_extract(self, progress_callback=None):
+        # Build (direct compile, CMake as fallback)
+        build_dir = os.path.join(self.install_dir, "build")
+        os.makedirs(build_dir, exist_ok=True)
 
-        try:
-            # 1. Download
-            if progress_callback: progress_callback(f"Downloading {self.zip_filename}...")
-            zip_path = os.path.join(EXTENSIONS_DIR, self.zip_filename)
-            
-            response = requests.get(self.download_url, stream=True)
-            response.raise_for_status()
-            
-            with open(zip_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+        if not self._compile_direct(build_dir, progress_callback):
+            self._cmake_build(build_dir, progress_callback)
 
-            # 2. Extract
-            if progress_callback: progress_callback("Extracting miniz source...")
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(EXTENSIONS_DIR)
-            
-            extracted_path = os.path.join(EXTENSIONS_DIR, self.extract_folder_name)
-            
-            if os.path.exists(self.install_dir):
-                shutil.rmtree(self.install_dir, onerror=self._on_rm_error)
-            
-            shutil.move(extracted_path, self.install_dir)
-            
-            try: os.remove(zip_path)
-            except: pass
+    def install(self, progress_callback=None):
+        self._default_install(progress_callback)
+
+    def _compile_direct(self, build_dir, progress_callback=None):
+        # miniz is a handful of C files; compiling them straight into a static
+        # archive avoids the whole CMake configure + generator round trip.
+        compiler = shutil.which("gcc") or shutil.which("clang") or shutil.which("cc")
+        archiver = shutil.which("ar") or shutil.which("llvm-ar")
+        if not compiler or not archiver:
+            return False
 
-            # 3. Build with CMake
-            if progress_callback: progress_callback("Configuring miniz with CMake...")
-            build_dir = os.path.join(self.install_dir, "build")
-            if not os.path.exists(build_dir): os.makedirs(build_dir)
-            
-            cmake_args = [
-                "cmake", "..", 
-                "-DBUILD_SHARED_LIBS=OFF", 
-                "-DMINIZ_BUILD_EXAMPLES=OFF",
-                "-DMINIZ_BUILD_UNIT_TESTS=OFF"
-            ]
-            
-            if os.name == 'nt' and shutil.which("mingw32-make"):
-                 cmake_args.extend(["-G", "MinGW Makefiles"])
+        sources = sorted(f for f in os.listdir(self.install_dir) if f.startswith("miniz") and f.endswith(".c"))
+        if not sources:
+            return False
 
-            result = subprocess.run(cmake_args, cwd=build_dir, capture_output=True, text=True)
+        if progress_callback: progress_callback("Compiling miniz directly...")
+        launcher = _compiler_launcher()
+        # Normally generated by CMake's generate_export_header; a static build needs no decoration
+        export_header = os.path.join(build_dir, "miniz_export.h")
+        if not os.path.exists(os.path.join(self.install_dir, "miniz_export.h")):
+            with open(export_header, "w") as f:
+                f.write("#ifndef MINIZ_EXPORT\n#define MINIZ_EXPORT\n#endif\n")
+
+        objects = []
+        for src in sources:
+            obj = os.path.join(build_dir, os.path.splitext(src)[0] + ".o")
+            cmd = [compiler, "-O3", "-c", os.path.join(self.install_dir, src), "-o", obj, "-I", build_dir, "-I", self.install_dir]
+            if os.name != 'nt':
+                cmd.insert(2, "-fPIC")
+            if launcher:
+                cmd.insert(0, launcher)
+            result = subprocess.run(cmd, capture_output=True, text=True)
             if result.returncode != 0:
-                 raise Exception(f"miniz CMake Configuration Failed:\n{result.stderr}")
+                if progress_callback: progress_callback(f"Direct compile failed, falling back to CMake:\n{result.stderr}")
+                return False
+            objects.append(obj)
 
-            # Build
-            if progress_callback: progress_callback("Building miniz...")
-            build_cmd = ["cmake", "--build", ".", "--config", "Release"]
-            
-            result = subprocess.run(build_cmd, cwd=build_dir, capture_output=True, text=True)
-            if result.returncode != 0:
-                 raise Exception(f"miniz Build Failed:\n{result.stderr}")
+        result = subprocess.run([archiver, "rcs", os.path.join(build_dir, "libminiz.a")] + objects, capture_output=True, text=True)
+        if result.returncode != 0:
+            if progress_callback: progress_callback(f"Archiving failed, falling back to CMake:\n{result.stderr}")
+            return False
+        return True
 
-            if progress_callback: progress_callback("miniz installed successfully.")
-            self.installed = True
-            self.path = self.install_dir
-            self.include_path = self.install_dir
-            self.lib_path = build_dir
+    def _cmake_build(self, build_dir, progress_callback=None):
+        cmake_args = [
+            "cmake", "..", 
+            "-DBUILD_SHARED_LIBS=OFF", 
+            "-DMINIZ_BUILD_EXAMPLES=OFF",
+            "-DMINIZ_BUILD_UNIT_TESTS=OFF"
+        ]
+        
+        cmake_args.extend(_cmake_generator_args())
+        cmake_args.extend(_compiler_launcher_args())
 
-        except Exception as e:
-            if progress_callback: progress_callback(f"Error: {e}")
-            raise e
+        if _cmake_cache_is_current(build_dir, cmake_args):
+            if progress_callback: progress_callback("Reusing existing miniz CMake configuration...")
+        else:
+            if progress_callback: progress_callback("Configuring miniz with CMake...")
+            # A cache from a different generator would make CMake refuse to reconfigure
+            if os.path.exists(os.path.join(build_dir, "CMakeCache.txt")):
+                os.remove(os.path.join(build_dir, "CMakeCache.txt"))
+                _force_rmtree(os.path.join(build_dir, "CMakeFiles"), ignore_errors=True)
+            returncode, output = _run_streamed(cmake_args, cwd=build_dir, progress_callback=progress_callback)
+            if returncode != 0:
+                 raise Exception(f"miniz CMake Configuration Failed:\n{output}")
+            _write_cmake_signature(build_dir, cmake_args)
+
+        # Build
+        if progress_callback: progress_callback("Building miniz...")
+        build_cmd = _cmake_build_cmd()
+        
+        returncode, output = _run_streamed(build_cmd, cwd=build_dir, progress_callback=progress_callback)
+        if returncode != 0:
+             raise Exception(f"miniz Build Failed:\n{output}")
 
     def uninstall(self, progress_callback=None):
-        if not self.installed:
-            if progress_callback: progress_callback("miniz is not installed.")
-            return
-        
-        try:
-            if progress_callback: progress_callback("Uninstalling miniz...")
-            if os.path.exists(self.install_dir):
-                shutil.rmtree(self.install_dir, onerror=self._on_rm_error)
-            
-            self.installed = False
-            self.path = None
-            self.include_path = None
-            self.lib_path = None
-            if progress_callback: progress_callback("miniz uninstalled successfully.")
-        except Exception as e:
-            if progress_callback: progress_callback(f"Error uninstalling miniz: {e}")
-            raise e
+        self._default_uninstall(progress_callback)
 
     def get_version(self):
         return f"v{self.version}"
 
-    def _on_rm_error(self, func, path, exc_info):
-        os.chmod(path, stat.S_IWRITE)
-        func(path)
-
     def get_include_path(self):
         return self.include_path
 
@@ -884,6 +1559,8 @@ class MinizExtension(Extension):
         return ["-lminiz"]
 
 class OpenGLExtension(Extension):
+    SENTINEL_CANARY = os.path.join("include", "GLFW", "glfw3.h")
+
     def __init__(self):
         super().__init__("opengl") # Displayed as "opengl" but acts as GLFW
         self.version = "3.4"
@@ -895,6 +1572,7 @@ class OpenGLExtension(Extension):
         self.include_path = None
         self.lib_path = None
 
+    def _probe_default_install(self):
         if self.check_default_install():
             self.path = self.install_dir
             self.installed = True
@@ -921,6 +1599,7 @@ class OpenGLExtension(Extension):
                 self.lib_path = os.path.join(self.install_dir, "build", "src")
         return self.installed
 
+    @_ttl_cached
     def check_default_install(self):
         # Check for glfw3.h and libglfw3.a
         include_check = os.path.exists(os.path.join(self.install_dir, "include", "GLFW", "glfw3.h"))
@@ -933,40 +1612,22 @@ class OpenGLExtension(Extension):
             if progress_callback: progress_callback("OpenGL (GLFW) already installed.")
             return
 
-        if not os.path.exists(EXTENSIONS_DIR):
-            os.makedirs(EXTENSIONS_DIR)
+        os.makedirs(EXTENSIONS_DIR, exist_ok=True)
 
         try:
             # 1. Download
             if progress_callback: progress_callback(f"Downloading {self.zip_filename}...")
-            zip_path = os.path.join(EXTENSIONS_DIR, self.zip_filename)
-            
-            response = requests.get(self.download_url, stream=True)
-            response.raise_for_status()
-            
-            with open(zip_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            archive = _cached_archive(self.download_url, self.zip_filename)
 
             # 2. Extract
             if progress_callback: progress_callback("Extracting GLFW source...")
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(EXTENSIONS_DIR)
-            
-            extracted_path = os.path.join(EXTENSIONS_DIR, self.extract_folder_name)
-            
-            if os.path.exists(self.install_dir):
-                shutil.rmtree(self.install_dir, onerror=self._on_rm_error)
-            
-            shutil.move(extracted_path, self.install_dir)
-            
-            try: os.remove(zip_path)
-            except: pass
+            with archive:
+                _extract_archive(archive, self.extract_folder_name, self.install_dir, progress_callback=progress_callback)
 
             # 3. Build with CMake
             if progress_callback: progress_callback("Configuring GLFW with CMake...")
             build_dir = os.path.join(self.install_dir, "build")
-            if not os.path.exists(build_dir): os.makedirs(build_dir)
+            os.makedirs(build_dir, exist_ok=True)
             
             cmake_args = [
                 "cmake", "..", 
@@ -976,23 +1637,26 @@ class OpenGLExtension(Extension):
                 "-DGLFW_BUILD_DOCS=OFF"
             ]
             
-            if os.name == 'nt' and shutil.which("mingw32-make"):
-                 cmake_args.extend(["-G", "MinGW Makefiles"])
+            cmake_args.extend(_cmake_generator_args())
+            cmake_args.extend(_compiler_launcher_args())
 
-            result = subprocess.run(cmake_args, cwd=build_dir, capture_output=True, text=True)
-            if result.returncode != 0:
-                 raise Exception(f"GLFW CMake Configuration Failed:\n{result.stderr}")
+            returncode, output = _run_streamed(cmake_args, cwd=build_dir, progress_callback=progress_callback)
+            if returncode != 0:
+                 raise Exception(f"GLFW CMake Configuration Failed:\n{output}")
 
             # Build
             if progress_callback: progress_callback("Building GLFW...")
-            build_cmd = ["cmake", "--build", ".", "--config", "Release"]
+            build_cmd = _cmake_build_cmd()
             
-            result = subprocess.run(build_cmd, cwd=build_dir, capture_output=True, text=True)
-            if result.returncode != 0:
-                 raise Exception(f"GLFW Build Failed:\n{result.stderr}")
+            with _BUILD_LOCK:
+                returncode, output = _run_streamed(build_cmd, cwd=build_dir, progress_callback=progress_callback)
+            if returncode != 0:
+                 raise Exception(f"GLFW Build Failed:\n{output}")
 
+            self._write_install_sentinel()
             if progress_callback: progress_callback("OpenGL (GLFW) installed successfully.")
             self.installed = True
+            self.invalidate_cache()
             self.path = self.install_dir
             self.include_path = os.path.join(self.install_dir, "include")
             self.lib_path = os.path.join(build_dir, "src")
@@ -1008,10 +1672,10 @@ class OpenGLExtension(Extension):
         
         try:
             if progress_callback: progress_callback("Uninstalling OpenGL (GLFW)...")
-            if os.path.exists(self.install_dir):
-                shutil.rmtree(self.install_dir, onerror=self._on_rm_error)
+            _remove_dir(self.install_dir)
             
             self.installed = False
+            self.invalidate_cache()
             self.path = None
             self.include_path = None
             self.lib_path = None
@@ -1023,25 +1687,21 @@ class OpenGLExtension(Extension):
     def get_version(self):
         return f"v{self.version}"
 
-    def _on_rm_error(self, func, path, exc_info):
-        os.chmod(path, stat.S_IWRITE)
-        func(path)
-
     def get_include_path(self):
         return self.include_path
 
     def get_lib_path(self):
         return self.lib_path
 
+    _LINK_FLAGS_NT = ("-lglfw3", "-lgdi32")
+    _LINK_FLAGS_POSIX = ("-lglfw3", "-lGL", "-lm", "-lX11", "-lpthread", "-lXrandr", "-lXi", "-ldl")
+
     def get_link_flags(self):
-        flags = ["-lglfw3"]
-        if os.name == 'nt':
-            flags.extend(["-lgdi32"])
-        else:
-            flags.extend(["-lGL", "-lm", "-lX11", "-lpthread", "-lXrandr", "-lXi", "-ldl"])
-        return flags
+        return list(self._LINK_FLAGS_NT if os.name == 'nt' else self._LINK_FLAGS_POSIX)
 
 class GLMExtension(Extension):
+    SENTINEL_CANARY = os.path.join("glm", "glm.hpp")
+
     def __init__(self):
         super().__init__("glm")
         self.version = "1.0.1"
@@ -1052,6 +1712,7 @@ class GLMExtension(Extension):
         
         self.include_path = None
 
+    def _probe_default_install(self):
         if self.check_default_install():
             self.path = self.install_dir
             self.installed = True
@@ -1076,6 +1737,7 @@ class GLMExtension(Extension):
                 self.include_path = self.install_dir
         return self.installed
 
+    @_ttl_cached
     def check_default_install(self):
         return os.path.exists(os.path.join(self.install_dir, "glm", "glm.hpp"))
 
@@ -1084,38 +1746,22 @@ class GLMExtension(Extension):
             if progress_callback: progress_callback("GLM already installed.")
             return
 
-        if not os.path.exists(EXTENSIONS_DIR):
-            os.makedirs(EXTENSIONS_DIR)
+        os.makedirs(EXTENSIONS_DIR, exist_ok=True)
 
         try:
             # 1. Download
             if progress_callback: progress_callback(f"Downloading {self.zip_filename}...")
-            zip_path = os.path.join(EXTENSIONS_DIR, self.zip_filename)
-            
-            response = requests.get(self.download_url, stream=True)
-            response.raise_for_status()
-            
-            with open(zip_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            archive = _cached_archive(self.download_url, self.zip_filename)
 
             # 2. Extract
             if progress_callback: progress_callback("Extracting GLM source...")
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(EXTENSIONS_DIR)
-            
-            extracted_path = os.path.join(EXTENSIONS_DIR, self.extract_folder_name)
-            
-            if os.path.exists(self.install_dir):
-                shutil.rmtree(self.install_dir, onerror=self._on_rm_error)
-            
-            shutil.move(extracted_path, self.install_dir)
-            
-            try: os.remove(zip_path)
-            except: pass
+            with archive:
+                _extract_archive(archive, self.extract_folder_name, self.install_dir, progress_callback=progress_callback)
 
+            self._write_install_sentinel()
             if progress_callback: progress_callback("GLM installed successfully (Header-only).")
             self.installed = True
+            self.invalidate_cache()
             self.path = self.install_dir
             self.include_path = self.install_dir
 
@@ -1130,10 +1776,10 @@ class GLMExtension(Extension):
         
         try:
             if progress_callback: progress_callback("Uninstalling GLM...")
-            if os.path.exists(self.install_dir):
-                shutil.rmtree(self.install_dir, onerror=self._on_rm_error)
+            _remove_dir(self.install_dir)
             
             self.installed = False
+            self.invalidate_cache()
             self.path = None
             self.include_path = None
             if progress_callback: progress_callback("GLM uninstalled successfully.")
@@ -1144,10 +1790,6 @@ class GLMExtension(Extension):
     def get_version(self):
         return f"v{self.version}"
 
-    def _on_rm_error(self, func, path, exc_info):
-        os.chmod(path, stat.S_IWRITE)
-        func(path)
-
     def get_include_path(self):
         return self.include_path
 
@@ -1158,6 +1800,10 @@ class GLMExtension(Extension):
         return []
 
 class EnttExtension(Extension):
+    display_name = "EnTT"
+    header_only = True
+    SENTINEL_CANARY = os.path.join("single_include", "entt", "entt.hpp")
+
     def __init__(self):
         super().__init__("entt")
         self.version = "3.16.0"
@@ -1167,103 +1813,33 @@ class EnttExtension(Extension):
         self.install_dir = os.path.join(EXTENSIONS_DIR, "entt")
         
         self.include_path = None
+        self.lib_path = None
 
+    def _probe_default_install(self):
         if self.check_default_install():
             self.path = self.install_dir
             self.installed = True
-            self.include_path = os.path.join(self.install_dir, "single_include")
-        else:
-            self.path = None
-            self.installed = False
+            self._apply_default_paths()
 
     def is_installed(self):
-        if self.path == self.install_dir:
-            if not self.check_default_install():
-                self.installed = False
-                self.path = None
-        elif self.path: # manual path
-             if not os.path.isdir(self.path):
-                 self.installed = False
-                 self.path = None
-        else: # not installed, check defaulted
-            if self.check_default_install():
-                self.path = self.install_dir
-                self.installed = True
-                self.include_path = os.path.join(self.install_dir, "single_include")
-        return self.installed
+        return self._default_is_installed()
 
+    @_ttl_cached
     def check_default_install(self):
         return os.path.exists(os.path.join(self.install_dir, "single_include", "entt", "entt.hpp"))
 
-    def install(self, progress_callback=None):
-        if self.installed:
-            if progress_callback: progress_callback("EnTT already installed.")
-            return
-
-        if not os.path.exists(EXTENSIONS_DIR):
-            os.makedirs(EXTENSIONS_DIR)
-
-        try:
-            # 1. Download
-            if progress_callback: progress_callback(f"Downloading {self.zip_filename}...")
-            zip_path = os.path.join(EXTENSIONS_DIR, self.zip_filename)
-            
-            response = requests.get(self.download_url, stream=True)
-            response.raise_for_status()
-            
-            with open(zip_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+    def _apply_default_paths(self):
+        self.include_path = os.path.join(self.install_dir, "single_include")
 
-            # 2. Extract
-            if progress_callback: progress_callback("Extracting EnTT source...")
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(EXTENSIONS_DIR)
-            
-            extracted_path = os.path.join(EXTENSIONS_DIR, self.extract_folder_name)
-            
-            if os.path.exists(self.install_dir):
-                shutil.rmtree(self.install_dir, onerror=self._on_rm_error)
-            
-            shutil.move(extracted_path, self.install_dir)
-            
-            try: os.remove(zip_path)
-            except: pass
-
-            if progress_callback: progress_callback("EnTT installed successfully (Header-only).")
-            self.installed = True
-            self.path = self.install_dir
-            self.include_path = os.path.join(self.install_dir, "single_include")
-
-        except Exception as e:
-            if progress_callback: progress_callback(f"Error: {e}")
-            raise e
+    def install(self, progress_callback=None):
+        self._default_install(progress_callback)
 
     def uninstall(self, progress_callback=None):
-        if not self.installed:
-            if progress_callback: progress_callback("EnTT is not installed.")
-            return
-        
-        try:
-            if progress_callback: progress_callback("Uninstalling EnTT...")
-            if os.path.exists(self.install_dir):
-                shutil.rmtree(self.install_dir, onerror=self._on_rm_error)
-            
-            self.installed = False
-            self.path = None
-            self.include_path = None
-            if progress_callback: progress_callback("EnTT uninstalled successfully.")
-        except Exception as e:
-            if progress_callback: progress_callback(f"Error uninstalling EnTT: {e}")
-            raise e
+        self._default_uninstall(progress_callback)
 
     def get_version(self):
         return f"v{self.version}"
 
-    def _on_rm_error(self, func, path, exc_info):
-        os.chmod(path, stat.S_IWRITE)
-        func(path)
-
     def get_include_path(self):
         return self.include_path
 
@@ -1279,11 +1855,60 @@ class PathBasedExtension(Extension):
         self.include_path = None
         self.lib_path = None
         self.install_dir = None
+        self._link_flags_cache = None
+
+    def invalidate_cache(self):
+        super().invalidate_cache()
+        self._link_flags_cache = None
+
+    def _scan(self):
+        # One scandir pass over install_dir. Returns the directories in os.walk (top-down)
+        # order plus per-directory header counts and library flags, both for the directory
+        # itself and summed over its subtree.
+        order = []
+        direct_headers = {}
+        subtree_headers = {}
+        subtree_libs = {}
+        children = {}
+        stack = [self.install_dir]
+        while stack:
+            current = stack.pop()
+            order.append(current)
+            headers = 0
+            has_lib = False
+            subdirs = []
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not entry.name.startswith('.') and entry.name not in _SKIP_SCAN_DIRS:
+                                subdirs.append(entry.path)
+                        elif entry.name.endswith(_HEADER_EXTS):
+                            headers += 1
+                        elif entry.name.endswith(_LIB_EXTS):
+                            has_lib = True
+            except OSError:
+                pass
+            direct_headers[current] = headers
+            subtree_headers[current] = headers
+            subtree_libs[current] = has_lib
+            children[current] = subdirs
+            stack.extend(reversed(subdirs))
+
+        # Children always come after their parent in order, so fold totals bottom-up
+        for d in reversed(order):
+            for c in children[d]:
+                subtree_headers[d] += subtree_headers[c]
+                subtree_libs[d] = subtree_libs[d] or subtree_libs[c]
+        return order, direct_headers, subtree_headers, subtree_libs
 
     def auto_detect_paths(self):
+        self._link_flags_cache = None
         if not self.install_dir or not os.path.exists(self.install_dir):
             return
 
+        order, direct_headers, subtree_headers, subtree_libs = self._scan()
+
         # Search for include dir
         # Priority 1: Standard include directories (prefer installed artifacts)
         potential_includes = [
@@ -1294,59 +1919,31 @@ class PathBasedExtension(Extension):
         
         found_inc = False
         for p in potential_includes:
-            if os.path.isdir(p):
-                # Check if it contains headers
-                has_headers = False
-                for root, dirs, files in os.walk(p):
-                    if any(f.endswith(('.h', '.hpp', '.hxx')) for f in files):
-                        has_headers = True
-                        break
-                if has_headers:
-                    self.include_path = p
-                    found_inc = True
-                    break
+            if subtree_headers.get(p, 0) > 0:
+                self.include_path = p
+                found_inc = True
+                break
         
         # Priority 2: Recursive search for any 'include' directory
         if not found_inc:
-             candidates = []
-             for root, dirs, files in os.walk(self.install_dir):
-                 if "include" in dirs:
-                     p = os.path.join(root, "include")
-                     # Check if it actually has headers (recursively count)
-                     header_count = 0
-                     for r, d, f in os.walk(p):
-                         header_count += sum(1 for x in f if x.endswith(('.h', '.hpp', '.hxx')))
-                     
-                     if header_count > 0:
-                         candidates.append((p, header_count))
-             
+             candidates = [p for p in order
+                           if os.path.basename(p) == "include" and p != self.install_dir and subtree_headers[p] > 0]
              if candidates:
-                 # Pick the one with the most headers
-                 candidates.sort(key=lambda x: x[1], reverse=True)
-                 self.include_path = candidates[0][0]
+                 # Pick the one with the most headers (first found wins ties)
+                 self.include_path = max(candidates, key=subtree_headers.__getitem__)
                  found_inc = True
 
         # Priority 3: 'src' directory
         if not found_inc:
             p = os.path.join(self.install_dir, "src")
-            if os.path.isdir(p):
-                has_headers = False
-                for root, dirs, files in os.walk(p):
-                    if any(f.endswith(('.h', '.hpp', '.hxx')) for f in files):
-                        has_headers = True
-                        break
-                if has_headers:
-                    self.include_path = p
-                    found_inc = True
+            if subtree_headers.get(p, 0) > 0:
+                self.include_path = p
+                found_inc = True
 
         # Priority 4: Root directory
         if not found_inc:
-             # Check if root has headers
-             if any(f.endswith(('.h', '.hpp', '.hxx')) for f in os.listdir(self.install_dir)):
-                 self.include_path = self.install_dir
-                 found_inc = True
-             # Or if root contains headers in subdirs (last resort, old behavior)
-             elif any(f.endswith(('.h', '.hpp', '.hxx')) for root, dirs, files in os.walk(self.install_dir) for f in files):
+             # Root has headers itself, or (last resort, old behavior) somewhere below it
+             if direct_headers[self.install_dir] or subtree_headers[self.install_dir]:
                  self.include_path = self.install_dir
                  found_inc = True
         
@@ -1360,10 +1957,9 @@ class PathBasedExtension(Extension):
         ]
 
         for p in potential_libs:
-            if os.path.isdir(p):
-                if any(f.endswith(('.a', '.lib')) for root, dirs, files in os.walk(p) for f in files):
-                    self.lib_path = p
-                    break
+            if subtree_libs.get(p):
+                self.lib_path = p
+                break
         
         # If no lib path found, but it's a header-only lib, just use include_path
         if not self.lib_path:
@@ -1377,28 +1973,42 @@ class PathBasedExtension(Extension):
     def get_lib_path(self):
         return self.lib_path
 
-    def get_link_flags(self):
+    def _compute_link_flags(self):
         flags = []
+        seen = set()
         # Auto-detect libs in the lib_path
-        if self.lib_path and os.path.exists(self.lib_path):
-            for f in os.listdir(self.lib_path):
-                if f.endswith(('.a', '.lib')):
-                    name = os.path.splitext(f)[0]
-                    if name.startswith('lib'): name = name[3:]
-                    # Avoid duplicates and common system libs if they somehow got here
-                    flag = f"-l{name}"
-                    if flag not in flags:
-                        flags.append(flag)
+        if self.lib_path and os.path.isdir(self.lib_path):
+            with os.scandir(self.lib_path) as it:
+                for entry in it:
+                    if entry.name.endswith(_LIB_EXTS):
+                        name = os.path.splitext(entry.name)[0]
+                        if name.startswith('lib'): name = name[3:]
+                        # Avoid duplicates and common system libs if they somehow got here
+                        flag = f"-l{name}"
+                        if flag not in seen:
+                            seen.add(flag)
+                            flags.append(flag)
         
         # Special case for webview on Windows
         if self.name == "webview" and os.name == 'nt':
              sys_libs = ["-lole32", "-lshlwapi", "-lversion", "-luser32", "-ladvapi32", "-lshell32"]
              for lib in sys_libs:
-                 if lib not in flags:
+                 if lib not in seen:
                      flags.append(lib)
 
         return flags
 
+    def get_link_flags(self):
+        # Computed once per detected lib_path; callers get their own copy to extend
+        if self._link_flags_cache is None:
+            self._link_flags_cache = self._compute_link_flags()
+        return list(self._link_flags_cache)
+
+def _is_tag_ref(version):
+    # Refs containing a digit (v1.2.3, 1.2.3, 2024.01) are fetched as tags, anything else
+    # (main, vnext) as a branch
+    return any(char.isdigit() for char in version)
+
 class GitHubFetchExtension(PathBasedExtension):
     def __init__(self, repo_url, version="main"):
         # repo_url: https://github.com/user/repo
@@ -1413,14 +2023,11 @@ class GitHubFetchExtension(PathBasedExtension):
         
         # For GitHub zips: https://github.com/user/repo/archive/refs/heads/main.zip
         # or tags: https://github.com/user/repo/archive/refs/tags/v1.0.0.zip
-        if version.startswith('v') and any(char.isdigit() for char in version):
+        # Try tags first if it looks like a version, otherwise heads
+        if _is_tag_ref(version):
              self.download_url = f"{self.repo_url}/archive/refs/tags/{version}.zip"
         else:
-             # Try tags first if it looks like a version, otherwise heads
-             if any(char.isdigit() for char in version):
-                 self.download_url = f"{self.repo_url}/archive/refs/tags/{version}.zip"
-             else:
-                 self.download_url = f"{self.repo_url}/archive/refs/heads/{version}.zip"
+             self.download_url = f"{self.repo_url}/archive/refs/heads/{version}.zip"
              
         self.zip_filename = f"{self.repo_name}-{version}.zip"
         
@@ -1437,6 +2044,29 @@ class GitHubFetchExtension(PathBasedExtension):
     def auto_detect_paths(self):
         self.installed = super().auto_detect_paths()
 
+    def _fetch_zip(self, url, zip_path):
+        # Tag archives are immutable, so a cached copy is always current. Branch archives
+        # are revalidated with the ETag / Last-Modified from the previous download.
+        # Returns False when the cached archive was reused or re-downloaded unchanged.
+        entry = _load_fetch_cache().get(url) if os.path.exists(zip_path) else None
+        headers = {}
+        if entry:
+            if _is_tag_ref(self.version):
+                return False
+            if entry.get("etag"): headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"): headers["If-Modified-Since"] = entry["last_modified"]
+
+        result = self._download_to(url, zip_path, headers=headers)
+        if result is None:
+            return False
+        response_headers, sha256 = result
+        _update_fetch_cache(url, {
+            "etag": response_headers.get("ETag"),
+            "last_modified": response_headers.get("Last-Modified"),
+            "sha256": sha256,
+        })
+        # Servers that ignore the validators still resend identical bytes
+        return not (entry and entry.get("sha256") == sha256)
 
     def install(self, progress_callback=None):
         if self.is_installed():
@@ -1444,44 +2074,34 @@ class GitHubFetchExtension(PathBasedExtension):
              self.auto_detect_paths()
              return
 
-        if not os.path.exists(self.fetch_dir):
-            os.makedirs(self.fetch_dir)
+        os.makedirs(self.fetch_dir, exist_ok=True)
 
         try:
             if progress_callback: progress_callback(f"Fetching {self.repo_url} ({self.version})...")
-            zip_path = os.path.join(self.fetch_dir, self.zip_filename)
+            # Archives are kept in the cache so a re-fetch can be answered with a 304
+            zip_path = os.path.join(CACHE_DIR, "fetched", self.zip_filename)
+            os.makedirs(os.path.dirname(zip_path), exist_ok=True)
             
-            response = requests.get(self.download_url, stream=True)
-            if response.status_code != 200:
+            try:
+                fresh = self._fetch_zip(self.download_url, zip_path)
+            except requests.HTTPError:
                 # Try fallback for version naming (sometimes tags don't have 'v' or do)
                 alt_version = self.version[1:] if self.version.startswith('v') else f"v{self.version}"
                 alt_url = f"{self.repo_url}/archive/refs/tags/{alt_version}.zip"
                 if progress_callback: progress_callback(f"Trying alternative URL: {alt_url}")
-                response = requests.get(alt_url, stream=True)
-                
-            response.raise_for_status()
-            
-            with open(zip_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+                fresh = self._fetch_zip(alt_url, zip_path)
+            if not fresh:
+                if progress_callback: progress_callback("Archive unchanged upstream, using cached copy.")
 
             if progress_callback: progress_callback("Extracting...")
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            with _open_zip(zip_path) as zip_ref:
                 # The first folder in the zip is usually the root of the repo
                 namelist = zip_ref.namelist()
                 if not namelist:
                     raise Exception("Downloaded zip is empty")
                     
                 top_dir = namelist[0].split('/')[0]
-                zip_ref.extractall(self.fetch_dir)
-                
-                extracted_path = os.path.join(self.fetch_dir, top_dir)
-                if os.path.exists(self.install_dir):
-                    shutil.rmtree(self.install_dir, onerror=self._on_rm_error)
-                shutil.move(extracted_path, self.install_dir)
-
-            try: os.remove(zip_path)
-            except: pass
+                _extract_into(zip_ref, top_dir, self.install_dir, archive_path=zip_path)
 
             self.auto_detect_paths()
             self.installed = True
@@ -1493,7 +2113,7 @@ class GitHubFetchExtension(PathBasedExtension):
                     if progress_callback: progress_callback(f"CMakeLists.txt found. Attempting to build {self.name}...")
                     build_dir = os.path.join(self.install_dir, "build")
                     install_dir = os.path.join(self.install_dir, "install")
-                    if not os.path.exists(build_dir): os.makedirs(build_dir)
+                    os.makedirs(build_dir, exist_ok=True)
                     
                     # Configure
                     cmake_cmd = [
@@ -1504,16 +2124,21 @@ class GitHubFetchExtension(PathBasedExtension):
                         "-DBUILD_EXAMPLES=OFF"
                     ]
                     
-                    if os.name == 'nt' and shutil.which("mingw32-make"):
-                         cmake_cmd.extend(["-G", "MinGW Makefiles"])
+                    cmake_cmd.extend(_cmake_generator_args())
+                    cmake_cmd.extend(_compiler_launcher_args())
                          
                     if progress_callback: progress_callback("Configuring with CMake...")
-                    subprocess.run(cmake_cmd, check=True, cwd=build_dir, capture_output=True)
+                    returncode, output = _run_streamed(cmake_cmd, cwd=build_dir, progress_callback=progress_callback)
+                    if returncode != 0:
+                        raise Exception(f"CMake configuration failed:\n{output}")
                     
                     # Build & Install
                     if progress_callback: progress_callback("Building and Installing...")
-                    build_cmd = ["cmake", "--build", build_dir, "--target", "install", "--config", "Release"]
-                    subprocess.run(build_cmd, check=True, cwd=build_dir, capture_output=True)
+                    build_cmd = _cmake_build_cmd(build_dir, target="install")
+                    with _BUILD_LOCK:
+                        returncode, output = _run_streamed(build_cmd, cwd=build_dir, progress_callback=progress_callback)
+                    if returncode != 0:
+                        raise Exception(f"Build failed:\n{output}")
                     
                     if progress_callback: progress_callback(f"Build successful. Artifacts installed to {install_dir}")
                     
@@ -1528,38 +2153,12 @@ class GitHubFetchExtension(PathBasedExtension):
             if progress_callback: progress_callback(f"Error fetching {self.name}: {e}")
             raise e
 
-    def _on_rm_error(self, func, path, exc_info):
-        os.chmod(path, stat.S_IWRITE)
-        func(path)
-
     def get_include_path(self):
         return self.include_path
 
     def get_lib_path(self):
         return self.lib_path
 
-    def get_link_flags(self):
-        flags = []
-        # Auto-detect libs in the lib_path
-        if self.lib_path and os.path.exists(self.lib_path):
-            for f in os.listdir(self.lib_path):
-                if f.endswith(('.a', '.lib')):
-                    name = os.path.splitext(f)[0]
-                    if name.startswith('lib'): name = name[3:]
-                    # Avoid duplicates and common system libs if they somehow got here
-                    flag = f"-l{name}"
-                    if flag not in flags:
-                        flags.append(flag)
-        
-        # Special case for webview on Windows
-        if self.repo_name == "webview" and os.name == 'nt':
-             sys_libs = ["-lole32", "-lshlwapi", "-lversion", "-luser32", "-ladvapi32", "-lshell32"]
-             for lib in sys_libs:
-                 if lib not in flags:
-                     flags.append(lib)
-
-        return flags
-
     def to_dict(self):
         return {
             "type": "github",
@@ -1606,6 +2205,14 @@ class CustomExtension(Extension):
         self.installed = True # Custom extensions are assumed installed
 
     def is_installed(self):
+        return self._check_paths()
+
+    # No install_dir, so no sentinel; the two isdir probes are TTL-cached like the built-ins
+    def _sentinel_state(self):
+        return None
+
+    @_ttl_cached
+    def _check_paths(self):
         return os.path.isdir(self.include_path) and os.path.isdir(self.lib_path)
 
     def install(self, progress_callback=None):
@@ -1640,25 +2247,61 @@ class CustomExtension(Extension):
             data["flags"]
         )
 
+def install_many(exts, progress_callback=None, max_workers=4):
+    # Downloads overlap across threads; compile steps are serialized by _BUILD_LOCK.
+    # Every install runs to completion, then the first failure (if any) is re-raised.
+    # Messages are tagged with the extension name, since several installs interleave.
+    lock = threading.Lock()
+    def reporter(name):
+        def report(msg):
+            if progress_callback:
+                with lock:
+                    progress_callback(f"[{name}] {msg}")
+        return report
+
+    errors = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(ext.install, reporter(ext.name)): ext for ext in exts}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                errors.append(e)
+    if errors:
+        raise errors[0]
+
 class ExtensionManager:
+    BUILTIN_EXTENSIONS = {
+        "raylib": RaylibExtension,
+        "opencv": OpenCVExtension,
+        "miniaudio": MiniaudioExtension,
+        "tinyxml": TinyXMLExtension,
+        "miniz": MinizExtension,
+        "entt": EnttExtension,
+        "opengl": OpenGLExtension,
+        "glm": GLMExtension
+    }
+
     def __init__(self):
-        self.extensions = {
-            "raylib": RaylibExtension(),
-            "opencv": OpenCVExtension(),
-            "miniaudio": MiniaudioExtension(),
-            "tinyxml": TinyXMLExtension(),
-            "miniz": MinizExtension(),
-            "entt": EnttExtension(),
-            "opengl": OpenGLExtension(),
-            "glm": GLMExtension()
-        }
+        # Extensions are created, and the custom extensions file read, on first use
+        self.extensions = {}
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        # Keep the built-in order even if some were already created by get_extension()
+        created = self.extensions
+        self.extensions = {name: created.get(name) or factory() for name, factory in self.BUILTIN_EXTENSIONS.items()}
+        self.extensions.update(created)
         self.load_custom_extensions()
 
     def load_custom_extensions(self):
         if os.path.exists(CUSTOM_EXTENSIONS_FILE):
             try:
-                with open(CUSTOM_EXTENSIONS_FILE, 'r') as f:
-                    data = json.load(f)
+                with open(CUSTOM_EXTENSIONS_FILE, 'rb') as f:
+                    data = _json_loads(f.read())
                     for ext_data in data:
                         if ext_data.get("type") == "github":
                             ext = GitHubFetchExtension(ext_data["repo_url"], ext_data["version"])
@@ -1669,6 +2312,8 @@ class ExtensionManager:
                 print(f"Failed to load custom extensions: {e}")
 
     def save_custom_extensions(self):
+        # Never write out the list before the existing file has been read
+        self._ensure_loaded()
         custom_exts = []
         for ext in self.extensions.values():
             if isinstance(ext, CustomExtension):
@@ -1676,32 +2321,39 @@ class ExtensionManager:
             elif isinstance(ext, GitHubFetchExtension):
                 custom_exts.append(ext.to_dict())
                 
-        if not os.path.exists(EXTENSIONS_DIR):
-            os.makedirs(EXTENSIONS_DIR)
+        os.makedirs(EXTENSIONS_DIR, exist_ok=True)
             
         try:
-            with open(CUSTOM_EXTENSIONS_FILE, 'w') as f:
-                json.dump(custom_exts, f, indent=4)
+            _write_json(CUSTOM_EXTENSIONS_FILE, custom_exts)
         except Exception as e:
             print(f"Failed to save custom extensions: {e}")
 
     def add_extension(self, extension):
+        self._ensure_loaded()
         self.extensions[extension.name] = extension
         if isinstance(extension, CustomExtension):
             self.save_custom_extensions()
 
     def remove_extension(self, name):
+        self._ensure_loaded()
         if name in self.extensions:
             del self.extensions[name]
             self.save_custom_extensions()
 
     def get_extension(self, name):
+        if name not in self.extensions:
+            if not self._loaded and name in self.BUILTIN_EXTENSIONS:
+                self.extensions[name] = self.BUILTIN_EXTENSIONS[name]()
+            else:
+                self._ensure_loaded()
         return self.extensions.get(name)
 
     def get_all_extensions(self):
+        self._ensure_loaded()
         return self.extensions.values()
 
     def install_all(self, progress_callback=None):
-        for ext in self.extensions.values():
-            if not ext.is_installed(): 
-                ext.install(progress_callback)
\ No newline at end of file
+        self._ensure_loaded()
+        pending = [ext for ext in self.extensions.values() if not ext.is_installed()]
+        if pending:
+            install_many(pending, progress_callback, max_workers=min(8, len(pending)))
\ No newline at end of file
@@ -2,22 +2,73 @@ import customtkinter as ctk
 import os
 import threading
 from tkinter import filedialog, messagebox
-import cmpile
 import sys
-import extensions
 import version
-import requests
-import zipfile
 import shutil
 import re
+import queue
+import time
+import itertools
+import concurrent.futures
+from functools import partial
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
 
 # Set theme
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("blue")
 
+# Log lines are queued by worker threads and flushed to the textbox in batches
+LOG_DRAIN_MS = 30
+LOG_DRAIN_MAX = 500
+# Workers block once this many lines are pending, so a flood can't outrun the textbox
+LOG_QUEUE_MAX = 256
+LOG_MAX_LINES = 5000
+LOG_TRIM_SLACK = 500
+
+# The suffixes cmpile.SOURCE_EXTS accepts from a folder, plus headers
+SOURCE_FILETYPES = (("C/C++ Files", "*.c *.cpp *.cc *.cxx *.h *.hpp"),)
+ADD_CHUNK = 1000
+
+# Without watchdog the Extensions tab falls back to polling every STATUS_POLL_MS
+STATUS_POLL_MS = 2000
+# Filesystem events within this window collapse into one status check
+FS_DEBOUNCE_MS = 200
+# Seconds an extension's installed state is reused by the GUI
+INSTALLED_TTL = 1.0
+# Parallel file copies when applying a self-update
+MERGE_WORKERS = 8
+# GUI-only options typed into the flags box; matched as whole words and stripped before compiling
+_INTERNAL_FLAGS_RE = re.compile(r'(?:^|\s)(--clean|--reinstall-tools|--dll|--cmake|--no-run|--fix)(?=\s|$)')
+
+def _is_under(path, root):
+    # Component-wise, so a sibling such as extensions_old/ doesn't count as inside extensions/
+    path, root = os.path.abspath(path), os.path.abspath(root)
+    try:
+        return os.path.commonpath([path, root]) == root
+    except ValueError:
+        # Different drives
+        return False
+
 class App(ctk.CTk):
     def __init__(self):
         super().__init__()
+        self._log_q = queue.Queue(maxsize=LOG_QUEUE_MAX)
+        # Installs, uninstalls and builds run one at a time on a single long-lived worker
+        self._tasks = queue.Queue()
+        self._closing = False
+        # A daemon, so closing the window never leaves a hidden process behind a long build;
+        # an interrupted install is caught by its missing install sentinel next time
+        self._worker = threading.Thread(target=self._worker_loop, name="cmpile-worker", daemon=True)
+        self._worker.start()
+        # Set synchronously on click so a second click can't queue a duplicate run
+        self._building = False
+        self._checking_updates = False
+        self.protocol("WM_DELETE_WINDOW", self.quit)
 
         self.title(f"Cmpile V{version.VERSION}")
         self.geometry("900x650")
@@ -52,7 +103,7 @@ class App(ctk.CTk):
         self.quit_button.grid(row=7, column=0, padx=20, pady=10, sticky="s")
 
         # -- Main Content Area (Tabview) --
-        self.tabview = ctk.CTkTabview(self, corner_radius=10)
+        self.tabview = ctk.CTkTabview(self, corner_radius=10, command=self._on_tab_change)
         self.tabview.grid(row=0, column=1, padx=20, pady=10, sticky="nsew")
         self.tabview.add("Build")
         self.tabview.add("Extensions")
@@ -66,19 +117,49 @@ class App(ctk.CTk):
         self.setup_build_tab()
 
         # -- EXTENSIONS TAB CONTENT --
-        self.setup_extensions_tab()
+        # Built on first visit to the tab (see _on_tab_change)
+        self._ext_tab_ready = False
 
         # Logic
         self.source_files = []
+        self._source_set = set()
+        self._file_rendered_count = 0
+        self._compiler_override = ""
+        # Whether the override was absent from PATH before the GUI put it there
+        self._override_added = False
+        # cmpile/extensions (and the rich/requests stack behind them) load after the first paint
+        self.builder = None
+        self.extension_manager = None
+        self._ext_status_cache = {}
+        self._installed_cache = {}
+        self._ext_rows = {}
+        self._ext_row_pool = []
+        self._ext_cache_version = 0
+        self._ext_cache = None
+        self._observer = None
+        self._watching_parent = False
+        self._fs_event = threading.Event()
+
+        self.after(LOG_DRAIN_MS, self._drain_log)
+        self.after(10, self._late_init)
+
+    def _late_init(self):
+        import cmpile
+        import extensions
         self.builder = cmpile.CmpileBuilder(log_callback=self.log_message)
         self.extension_manager = extensions.ExtensionManager()
-        self._ext_status_cache = {}
-        
-        # Initialize extension list UI
-        self.refresh_extension_list()
-        
-        # Start auto-refresh
-        self.check_extensions_status()
+
+    def _on_tab_change(self):
+        if self.tabview.get() == "Extensions" and not self._ext_tab_ready:
+            self.setup_extensions_tab()
+            self._ext_tab_ready = True
+            # Initialize extension list UI
+            self.refresh_extension_list()
+            # Start auto-refresh
+            if self._start_status_watch():
+                self.after(FS_DEBOUNCE_MS, self._poll_fs_event)
+            else:
+                self.after(STATUS_POLL_MS, self.check_extensions_status)
 
     def setup_build_tab(self):
         tab = self.tabview.tab("Build")
@@ -145,33 +226,122 @@ class App(ctk.CTk):
         self.ext_scroll_frame = ctk.CTkScrollableFrame(tab, label_text="Available Extensions")
         self.ext_scroll_frame.pack(fill="both", expand=True, padx=10, pady=10)
 
-    def refresh_extension_list(self):
-        # Clear existing
-        for widget in self.ext_scroll_frame.winfo_children():
-            widget.destroy()
+    def refresh_extension_list(self, statuses=None):
+        # Every install/uninstall/path change ends in a refresh, so this invalidates the build's extension info
+        self._ext_cache_version += 1
+        if not self._ext_tab_ready:
+            return
 
-        # Add items
-        for ext in self.extension_manager.get_all_extensions():
-            self.create_extension_item(ext)
-            self._ext_status_cache[ext.name] = ext.is_installed()
+        # Add items, probing each extension once (or reusing the statuses just polled)
+        if statuses is None:
+            statuses = {ext.name: self._is_installed(ext) for ext in self.extension_manager.get_all_extensions()}
+        current = self.extension_manager.get_all_extensions()
+        # Rows are kept between refreshes; only removed extensions lose theirs
+        names = {ext.name for ext in current}
+        for name in [n for n in self._ext_rows if n not in names]:
+            self._release_extension_item(self._ext_rows.pop(name))
+        for ext in current:
+            row = self._ext_rows.get(ext.name)
+            if row is None or row["ext"] is not ext:
+                if row is not None:
+                    self._release_extension_item(row)
+                row = self.create_extension_item(ext)
+                self._ext_rows[ext.name] = row
+            self.update_extension_item(row, statuses[ext.name])
+        self._ext_status_cache = statuses
+
+    def _is_installed(self, ext):
+        # Memoized per extension name so one refresh or build probes each extension once;
+        # install/uninstall/set-path drop the entry as soon as they change something
+        now = time.monotonic()
+        hit = self._installed_cache.get(ext.name)
+        if hit and now - hit[0] < INSTALLED_TTL:
+            return hit[1]
+        result = ext.is_installed()
+        self._installed_cache[ext.name] = (now, result)
+        return result
 
     def check_extensions_status(self):
-        changed = False
-        for ext in self.extension_manager.get_all_extensions():
-            # Trigger dynamic check
-            new_status = ext.is_installed()
-            if self._ext_status_cache.get(ext.name) != new_status:
-                changed = True
-                # Cache will be updated in refresh_extension_list
-                break
-        
-        if changed:
-            self.refresh_extension_list()
+        statuses = {ext.name: self._is_installed(ext) for ext in self.extension_manager.get_all_extensions()}
+        if statuses != self._ext_status_cache:
+            self.refresh_extension_list(statuses)
         
         # Check again in 2 seconds
-        self.after(2000, self.check_extensions_status)
+        self.after(STATUS_POLL_MS, self.check_extensions_status)
+
+    def _start_status_watch(self):
+        # Watches where installs land instead of polling; returns False if that isn't possible
+        if Observer is None:
+            return False
+        import extensions
+        # Top level only: extensions/ (or its parent until it exists), each install directory
+        # (where the install sentinel lands) and the parent of any manual or custom path. Never
+        # recursive, so object files written into build trees and .cache raise no events
+        roots = {extensions.EXTENSIONS_DIR} if os.path.isdir(extensions.EXTENSIONS_DIR) \
+            else {os.path.dirname(extensions.EXTENSIONS_DIR)}
+        for ext in self.extension_manager.get_all_extensions():
+            install_dir = getattr(ext, "install_dir", None)
+            if install_dir and os.path.isdir(install_dir):
+                roots.add(install_dir)
+            if ext.path and not _is_under(ext.path, extensions.EXTENSIONS_DIR):
+                parent = os.path.dirname(os.path.abspath(ext.path))
+                if os.path.isdir(parent):
+                    roots.add(parent)
+
+        handler = FileSystemEventHandler()
+        handler.on_any_event = self._on_fs_event
+        observer = Observer()
+        try:
+            for root in roots:
+                observer.schedule(handler, root, recursive=False)
+            observer.start()
+        except Exception:
+            return False
+        self._observer = observer
+        self._watching_parent = extensions.EXTENSIONS_DIR not in roots
+        return True
+
+    def _on_fs_event(self, event):
+        # Called on the observer thread, which must not touch Tk; _poll_fs_event picks it up
+        self._fs_event.set()
+
+    def _poll_fs_event(self):
+        # One status check per FS_DEBOUNCE_MS however many events arrived in between
+        if self._fs_event.is_set():
+            self._fs_event.clear()
+            self._check_after_fs_event()
+        # Stops once the watch has fallen back to check_extensions_status
+        if self._observer is not None:
+            self.after(FS_DEBOUNCE_MS, self._poll_fs_event)
+
+    def _check_after_fs_event(self):
+        import extensions
+        # extensions/ may have just been created
+        rewatch = self._watching_parent and os.path.isdir(extensions.EXTENSIONS_DIR)
+        statuses = {}
+        for ext in self.extension_manager.get_all_extensions():
+            # The TTL caches would otherwise hide a change that just happened
+            ext.invalidate_cache()
+            self._installed_cache.pop(ext.name, None)
+            statuses[ext.name] = self._is_installed(ext)
+        if statuses != self._ext_status_cache:
+            # Installs and uninstalls swap install directories, so the watched ones are stale
+            rewatch = True
+            self.refresh_extension_list(statuses)
+        if rewatch and self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+            if not self._start_status_watch():
+                self.after(STATUS_POLL_MS, self.check_extensions_status)
 
     def create_extension_item(self, ext):
+        # Reuse a row released by a removed extension before building new widgets
+        if self._ext_row_pool:
+            row = self._ext_row_pool.pop()
+            row["frame"].pack(fill="x", padx=5, pady=5)
+            self._bind_extension_item(row, ext)
+            return row
+
         item_frame = ctk.CTkFrame(self.ext_scroll_frame)
         item_frame.pack(fill="x", padx=5, pady=5)
 
@@ -179,37 +349,82 @@ class App(ctk.CTk):
         info_frame = ctk.CTkFrame(item_frame, fg_color="transparent")
         info_frame.pack(side="left", padx=10, pady=5)
 
-        name_lbl = ctk.CTkLabel(info_frame, text=ext.name, font=("Arial", 16, "bold"))
+        name_lbl = ctk.CTkLabel(info_frame, text="", font=("Arial", 16, "bold"))
         name_lbl.grid(row=0, column=0, sticky="w")
 
-        version_lbl = ctk.CTkLabel(info_frame, text=ext.get_version(), font=("Arial", 12, "bold"), text_color="gray")
+        version_lbl = ctk.CTkLabel(info_frame, text="", font=("Arial", 12, "bold"), text_color="gray")
         version_lbl.grid(row=1, column=0, sticky="e", padx=(10, 0))
 
-        status_text = "Installed" if ext.is_installed() else "Not Installed"
-        status_color = "green" if ext.is_installed() else "gray"
-        
-        status_lbl = ctk.CTkLabel(item_frame, text=status_text, text_color=status_color)
+        status_lbl = ctk.CTkLabel(item_frame, text="")
         status_lbl.pack(side="left", padx=10)
 
-        if not ext.is_installed():
-            install_btn = ctk.CTkButton(item_frame, text="Install", width=100, 
-                                        command=lambda e=ext: self.install_extension(e))
-            install_btn.pack(side="right", padx=10)
-            
+        # Both button sets are created once; update_extension_item shows the right one
+        row = {
+            "frame": item_frame,
+            "name": name_lbl,
+            "version": version_lbl,
+            "status": status_lbl,
+            "install_btn": ctk.CTkButton(item_frame, text="Install", width=100),
             # Manual path button
-            path_btn = ctk.CTkButton(item_frame, text="Set Path", width=100, fg_color="gray",
-                                     command=lambda e=ext: self.set_extension_path(e))
-            path_btn.pack(side="right", padx=5)
+            "path_btn": ctk.CTkButton(item_frame, text="Set Path", width=100, fg_color="gray"),
+            "path_lbl": ctk.CTkLabel(item_frame, text="", font=("Arial", 10)),
+            "uninstall_btn": ctk.CTkButton(item_frame, text="Uninstall", width=100, fg_color="red", hover_color="darkred"),
+        }
+        self._bind_extension_item(row, ext)
+        return row
+
+    def _bind_extension_item(self, row, ext):
+        row["ext"] = ext
+        row["installed"] = None
+        row["path"] = None
+        row["name"].configure(text=ext.name)
+        row["version"].configure(text=ext.get_version())
+        row["install_btn"].configure(command=partial(self.install_extension, ext))
+        row["path_btn"].configure(command=partial(self.set_extension_path, ext))
+        row["uninstall_btn"].configure(command=partial(self.uninstall_extension, ext))
+
+    def _release_extension_item(self, row):
+        # Unmapped rather than destroyed so the next new extension can take it over
+        row["frame"].pack_forget()
+        row["ext"] = None
+        self._ext_row_pool.append(row)
+
+    def update_extension_item(self, row, installed):
+        # Each widget is reconfigured only when what it shows actually changed
+        if installed and row["path"] != row["ext"].path:
+            row["path"] = row["ext"].path
+            row["path_lbl"].configure(text=f"Path: {row['path']}")
+        if row["installed"] == installed:
+            return
+        row["installed"] = installed
+
+        status_text = "Installed" if installed else "Not Installed"
+        status_color = "green" if installed else "gray"
+        row["status"].configure(text=status_text, text_color=status_color)
+
+        for key in ("install_btn", "path_btn", "path_lbl", "uninstall_btn"):
+            row[key].pack_forget()
+        if not installed:
+            row["install_btn"].pack(side="right", padx=10)
+            row["path_btn"].pack(side="right", padx=5)
+        else:
+            row["path_lbl"].pack(side="left", anchor="w", padx=10)
+            row["uninstall_btn"].pack(side="right", padx=10)
+
+    def _invalidate_ext_info(self, name=None):
+        # Runs where the change happens, not in the deferred refresh: a build queued behind
+        # an install on the worker would otherwise start before the refresh and reuse stale info
+        if name is None:
+            self._installed_cache.clear()
         else:
-             ctk.CTkLabel(item_frame, text=f"Path: {ext.path}", font=("Arial", 10)).pack(side="left", anchor="w", padx=10)
-             
-             uninstall_btn = ctk.CTkButton(item_frame, text="Uninstall", width=100, fg_color="red", hover_color="darkred",
-                                           command=lambda e=ext: self.uninstall_extension(e))
-             uninstall_btn.pack(side="right", padx=10)
+            self._installed_cache.pop(name, None)
+        self._ext_cache = None
+        self._ext_cache_version += 1
 
     def set_extension_path(self, ext):
         path = filedialog.askdirectory(title=f"Select {ext.name} directory")
         if path:
+            self._invalidate_ext_info(ext.name)
             if ext.set_manual_path(path):
                 self.log_message(f"Path set for {ext.name}", "success")
                 self.refresh_extension_list()
@@ -217,52 +432,56 @@ class App(ctk.CTk):
                 self.log_message(f"Invalid path for {ext.name}. Could not find required files.", "error")
 
     def uninstall_extension(self, ext):
+        import extensions
         if isinstance(ext, extensions.CustomExtension):
             self.extension_manager.remove_extension(ext.name)
             self.log_message(f"Custom extension '{ext.name}' removed from list.", "success")
             self.refresh_extension_list()
         else:
             self.log_message(f"Uninstalling {ext.name}...", "info")
-            t = threading.Thread(target=self._run_uninstall, args=(ext,))
-            t.start()
+            self._tasks.put((self._run_uninstall, (ext,)))
     
     def _run_uninstall(self, ext):
         def progress(msg):
              self.log_message(msg)
         try:
             ext.uninstall(progress_callback=progress)
-            self.after(0, self.refresh_extension_list)
         except Exception as e:
             self.log_message(str(e), "error")
+        finally:
+            self._invalidate_ext_info(ext.name)
+            self.after(0, self.refresh_extension_list)
 
     def install_extension(self, ext):
         self.log_message(f"Installing {ext.name}...", "info")
-        # Run in thread
-        t = threading.Thread(target=self._run_install, args=(ext,))
-        t.start()
+        # Run on the worker thread
+        self._tasks.put((self._run_install, (ext,)))
     
     def install_all_extensions(self):
         self.log_message("Installing all extensions...", "info")
-        t = threading.Thread(target=self._run_install_all)
-        t.start()
+        self._tasks.put((self._run_install_all, ()))
 
     def _run_install(self, ext):
         def progress(msg):
              self.log_message(msg)
         try:
             ext.install(progress_callback=progress)
-            self.after(0, self.refresh_extension_list)
         except Exception as e:
             self.log_message(str(e), "error")
+        finally:
+            self._invalidate_ext_info(ext.name)
+            self.after(0, self.refresh_extension_list)
 
     def _run_install_all(self):
         def progress(msg):
              self.log_message(msg)
         try:
             self.extension_manager.install_all(progress_callback=progress)
-            self.after(0, self.refresh_extension_list)
         except Exception as e:
             self.log_message(str(e), "error")
+        finally:
+            self._invalidate_ext_info()
+            self.after(0, self.refresh_extension_list)
 
     def add_custom_extension_dialog(self):
         dialog = ctk.CTkToplevel(self)
@@ -323,6 +542,7 @@ class App(ctk.CTk):
             
             flags = flags_str.split()
             
+            import extensions
             ext = extensions.CustomExtension(name, inc, lib, flags)
             self.extension_manager.add_extension(ext)
             self.refresh_extension_list()
@@ -332,23 +552,50 @@ class App(ctk.CTk):
         ctk.CTkButton(dialog, text="Add Extension", command=submit, fg_color="green").pack(pady=10)
 
     def add_files(self):
-        files = filedialog.askopenfilenames(filetypes=[("C/C++ Files", "*.c *.cpp *.h *.hpp")])
+        files = filedialog.askopenfilenames(filetypes=SOURCE_FILETYPES)
         if files:
-            for f in files:
-                if f not in self.source_files:
-                    self.source_files.append(f)
-            self.refresh_file_list()
+            self._add_sources(files)
 
     def add_folder(self):
         folder = filedialog.askdirectory()
         if folder:
-            if folder not in self.source_files:
-                self.source_files.append(folder)
+            import cmpile
+            # Expand now so the list shows the actual sources that will be built
+            self._add_sources(cmpile.iter_source_files(folder))
+
+    def _add_sources(self, paths):
+        # Paths are taken ADD_CHUNK at a time per idle callback so a huge selection or folder walk
+        # doesn't freeze the window; a clear_files in between ends the ingest
+        paths = iter(paths)
+        source_set = self._source_set
+        normcase, abspath = os.path.normcase, os.path.abspath
+
+        def ingest():
+            if self._source_set is not source_set:
+                return
+            chunk = list(itertools.islice(paths, ADD_CHUNK))
+            for f in chunk:
+                # Keyed case- and separator-insensitively on Windows (dialogs give C:/x, scandir C:\x)
+                key = normcase(abspath(f))
+                if key not in source_set:
+                    source_set.add(key)
+                    self.source_files.append(f)
             self.refresh_file_list()
+            if len(chunk) == ADD_CHUNK:
+                self.after_idle(ingest)
+
+        ingest()
 
     def clear_files(self):
+        import package_finder
         self.source_files = []
-        self.refresh_file_list()
+        self._source_set = set()
+        # Scan results are only kept for the files in the current list
+        package_finder.clear_scan_cache()
+        self._file_rendered_count = 0
+        self.file_textbox.configure(state="normal")
+        self.file_textbox.delete("0.0", "end")
+        self.file_textbox.configure(state="disabled")
 
     def clear_log(self):
         self.log_textbox.configure(state="normal")
@@ -356,32 +603,87 @@ class App(ctk.CTk):
         self.log_textbox.configure(state="disabled")
 
     def refresh_file_list(self):
+        # Only rows not yet shown are rendered, with one insert for the whole batch;
+        # the textbox is emptied only by clear_files
+        new_paths = self.source_files[self._file_rendered_count:]
+        if not new_paths:
+            return
+        self._file_rendered_count = len(self.source_files)
+        basename = os.path.basename
+        rows = "".join(f"{basename(f)}  ({f})\n" for f in new_paths)
         self.file_textbox.configure(state="normal")
-        self.file_textbox.delete("0.0", "end")
-        for f in self.source_files:
-            self.file_textbox.insert("end", f"{os.path.basename(f)}  ({f})\n")
+        self.file_textbox.insert("end", rows)
         self.file_textbox.configure(state="disabled")
 
     def log_message(self, message, style=""):
-        self.after(0, lambda: self._append_log(message, style))
-
-    def _append_log(self, message, style):
+        # Safe from any thread; _drain_log does the Tk work
+        if self._closing:
+            # Nothing drains the queue once the window is gone
+            return
+        if threading.current_thread() is not threading.main_thread():
+            # Bounded wait so a producer blocked on a full queue gives up once the window closes
+            while not self._closing:
+                try:
+                    self._log_q.put((message, style), timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+            return
+        # The drain runs on this thread, so flush instead of blocking on a full queue
+        try:
+            self._log_q.put_nowait((message, style))
+        except queue.Full:
+            self._flush_log()
+            self._log_q.put_nowait((message, style))
+
+    def _drain_log(self):
+        self._flush_log()
+        self.after(LOG_DRAIN_MS, self._drain_log)
+
+    def _flush_log(self):
+        # Idle ticks return here instead of raising and catching queue.Empty
+        if self._log_q.empty():
+            return
+        lines = []
+        try:
+            while len(lines) < LOG_DRAIN_MAX:
+                lines.append(self._log_q.get_nowait()[0])
+        except queue.Empty:
+            pass
+        if lines:
+            # The trailing newline rides along in the one join instead of a per-line concat
+            lines.append("")
+            self._append_log("\n".join(lines))
+
+    def _append_log(self, text):
+        # text is one or more complete lines; the textbox is unlocked once per batch
         self.log_textbox.configure(state="normal")
-        self.log_textbox.insert("end", message + "\n")
+        self.log_textbox.insert("end", text)
+        # Keep only the newest LOG_MAX_LINES lines so long builds don't slow the widget down;
+        # trimming LOG_TRIM_SLACK extra lines means the delete runs once per few batches, not every one
+        line_count = int(self.log_textbox.index("end-1c").split(".")[0])
+        if line_count > LOG_MAX_LINES:
+            excess = line_count - (LOG_MAX_LINES - LOG_TRIM_SLACK)
+            self.log_textbox.delete("1.0", f"{excess + 1}.0")
         self.log_textbox.see("end")
         self.log_textbox.configure(state="disabled")
         # Ensure build tab is visible if logging error? Maybe not force switch.
 
     def check_for_updates(self):
-        self.log_message("Checking for updates...", "info")
+        if self._checking_updates:
+            return
+        self._checking_updates = True
         self.update_btn.configure(state="disabled")
+        self.log_message("Checking for updates...", "info")
         t = threading.Thread(target=self._run_check_updates)
         t.daemon = True
         t.start()
 
     def _run_check_updates(self):
+        import download_script
+        remote_version = None
         try:
-            response = requests.get(version.VERSION_URL, timeout=10)
+            response = download_script.SESSION.get(version.VERSION_URL, timeout=download_script.HTTP_TIMEOUT)
             if response.status_code == 200:
                 # Parse version from python file content
                 match = re.search(r'VERSION\s*=\s*["\']([^"\']+)["\']', response.text)
@@ -389,87 +691,101 @@ class App(ctk.CTk):
                     remote_version = match.group(1)
                     if remote_version != version.VERSION:
                         self.log_message(f"New version available: {remote_version} (Current: {version.VERSION})", "success")
-                        self.after(0, lambda: self._show_update_dialog(remote_version))
                     else:
                         self.log_message("Cmpile is up to date.", "success")
+                        remote_version = None
                 else:
                     self.log_message("Could not parse remote version.", "error")
             else:
                 self.log_message(f"Could not check for updates. (HTTP {response.status_code})", "error")
         except Exception as e:
             self.log_message(f"Error checking for updates: {e}", "error")
+            remote_version = None
         finally:
-            self.after(0, lambda: self.update_btn.configure(state="normal"))
+            # The dialog takes over the guard so the button stays disabled into the update
+            if remote_version:
+                self.after(0, self._show_update_dialog, remote_version)
+            else:
+                self.after(0, self._update_finished)
+
+    def _update_finished(self):
+        self._checking_updates = False
+        self.update_btn.configure(state="normal")
 
     def _show_update_dialog(self, new_version):
+        self._checking_updates = False
         if messagebox.askyesno("Update Available", f"A new version ({new_version}) is available. Do you want to update now?"):
             self.start_update()
+        else:
+            self._update_finished()
 
     def start_update(self):
-        self.log_message("Starting update...", "info")
+        if self._checking_updates:
+            return
+        self._checking_updates = True
         self.update_btn.configure(state="disabled")
+        self.log_message("Starting update...", "info")
         t = threading.Thread(target=self._run_update)
         t.daemon = True
         t.start()
 
     def _run_update(self):
+        import download_script
         try:
             self.log_message("Downloading latest version...")
-            zip_path = os.path.join(os.getcwd(), "update.zip")
-            response = requests.get(version.DOWNLOAD_URL, stream=True)
-            response.raise_for_status()
-            with open(zip_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            
-            self.log_message("Extracting update...")
-            extract_dir = os.path.join(os.getcwd(), "update_temp")
-            if os.path.exists(extract_dir):
-                shutil.rmtree(extract_dir)
-            
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
+            # Kept in memory (or an anonymous temp file) and extracted from there; no update.zip
+            with download_script.download_spooled(version.DOWNLOAD_URL, log_func=self.log_message) as archive:
+                self.log_message("Extracting update...")
+                extract_dir = os.path.join(os.getcwd(), "update_temp")
+                if os.path.exists(extract_dir):
+                    shutil.rmtree(extract_dir)
+
+                download_script.extract_zip(archive, extract_dir)
             
             # Usually GitHub zip contains a subfolder like Cmpile-v2.7-main
             subdirs = [d for d in os.listdir(extract_dir) if os.path.isdir(os.path.join(extract_dir, d))]
             if subdirs:
                 src_dir = os.path.join(extract_dir, subdirs[0])
                 self.log_message("Applying update (merging files)...")
-                for item in os.listdir(src_dir):
-                    s = os.path.join(src_dir, item)
-                    d = os.path.join(os.getcwd(), item)
-                    if os.path.isdir(s):
-                        if os.path.exists(d):
-                            # For directories, we might want to be careful, but for this project we'll just merge
-                            # shutil.copytree(s, d, dirs_exist_ok=True) is Python 3.8+
-                            self._merge_dirs(s, d)
-                        else:
-                            shutil.copytree(s, d)
-                    else:
-                        shutil.copy2(s, d)
+                self._merge_dirs(src_dir, os.getcwd())
                 
                 self.log_message("Update complete! Please restart Cmpile.", "success")
-                os.remove(zip_path)
                 shutil.rmtree(extract_dir)
             else:
                 self.log_message("Error: Update package format unrecognized.", "error")
         except Exception as e:
             self.log_message(f"Update failed: {e}", "error")
         finally:
-            self.after(0, lambda: self.update_btn.configure(state="normal"))
+            self.after(0, self._update_finished)
 
     def _merge_dirs(self, src, dst):
-        for item in os.listdir(src):
-            s = os.path.join(src, item)
-            d = os.path.join(dst, item)
-            if os.path.isdir(s):
-                if not os.path.exists(d):
-                    os.makedirs(d)
-                self._merge_dirs(s, d)
-            else:
-                shutil.copy2(s, d)
+        # Walks src with scandir (no extra stat per entry), creating directories as it goes,
+        # then copies the files on a small pool so per-file copy latency overlaps
+        copies = []
+        stack = [(src, dst)]
+        while stack:
+            s_dir, d_dir = stack.pop()
+            os.makedirs(d_dir, exist_ok=True)
+            with os.scandir(s_dir) as it:
+                for entry in it:
+                    d = os.path.join(d_dir, entry.name)
+                    if entry.is_symlink():
+                        # Recreated as a link rather than followed, so a link out of src can't
+                        # pull in (or loop over) whatever it points at
+                        if os.path.islink(d) or os.path.isfile(d):
+                            os.remove(d)
+                        shutil.copy2(entry.path, d, follow_symlinks=False)
+                    elif entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, d))
+                    else:
+                        copies.append((entry.path, d))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=MERGE_WORKERS) as pool:
+            # list() re-raises the first failed copy
+            list(pool.map(lambda pair: shutil.copy2(*pair), copies))
 
     def start_build(self):
+        if self._building:
+            return
         if not self.source_files:
             self.log_message("Please select source files first!", "error")
             return
@@ -498,15 +814,16 @@ class App(ctk.CTk):
             return
 
         # Parse internal flags from text
-        clean_from_text = "--clean" in raw_flags
-        reinstall_from_text = "--reinstall-tools" in raw_flags
-        dll_from_text = "--dll" in raw_flags
-        cmake_from_text = "--cmake" in raw_flags
-        no_run_from_text = "--no-run" in raw_flags
-        fix_from_text = "--fix" in raw_flags
+        found = set(_INTERNAL_FLAGS_RE.findall(raw_flags))
+        clean_from_text = "--clean" in found
+        reinstall_from_text = "--reinstall-tools" in found
+        dll_from_text = "--dll" in found
+        cmake_from_text = "--cmake" in found
+        no_run_from_text = "--no-run" in found
+        fix_from_text = "--fix" in found
 
         # Remove internal flags so they don't break the compiler
-        flags = raw_flags.replace("--clean", "").replace("--reinstall-tools", "").replace("--dll", "").replace("--cmake", "").replace("--no-run", "").replace("--fix", "").strip()
+        flags = _INTERNAL_FLAGS_RE.sub(" ", raw_flags).strip()
 
         # Combine with checkboxes
         clean = (self.clean_checkbox.get() == 1) or clean_from_text
@@ -524,12 +841,18 @@ class App(ctk.CTk):
             # Remove --install-pkg from flags
             flags = re.sub(r'--install-pkg\s+[^\s]+', '', flags).strip()
 
+        import cmpile
         # Check for compiler override
-        compiler_override = self.compiler_path_entry.get().strip()
+        compiler_override = self.compiler_path_entry.get().strip() if self._ext_tab_ready else ""
+        # The builder finds compilers through PATH, so the override has to live there; when it
+        # changes, drop the previous one, but only if it was this GUI that added it
+        if compiler_override != self._compiler_override:
+            if self._compiler_override and self._override_added:
+                cmpile.remove_from_path(self._compiler_override)
+            self._override_added = bool(compiler_override) and not cmpile.is_on_path(compiler_override)
+        self._compiler_override = compiler_override
         if compiler_override:
-            # Need to pass this to builder.
-            # Currently CmpileBuilder doesn't accept it easily, need to modify CmpileBuilder or modify os.environ
-            os.environ["PATH"] = compiler_override + os.pathsep + os.environ["PATH"]
+            cmpile.prepend_to_path(compiler_override, move=True)
             
         # Get compiler preference
         compiler_choice_str = self.compiler_option.get()
@@ -537,29 +860,47 @@ class App(ctk.CTk):
         if "LLVM" in compiler_choice_str: compiler_pref = "llvm"
         elif "WinLibs" in compiler_choice_str: compiler_pref = "winlibs"
 
+        self._building = True
         self.build_btn.configure(state="disabled")
         self.log_textbox.configure(state="normal")
         self.log_textbox.delete("0.0", "end")
         self.log_textbox.configure(state="disabled")
 
-        thread = threading.Thread(target=self.run_build_process, args=(flags, clean, build_dll, use_cmake, compiler_pref, reinstall, no_run, extra_packages, fix_issues))
-        thread.start()
+        self._tasks.put((self.run_build_process, (flags, clean, build_dll, use_cmake, compiler_pref, reinstall, no_run, extra_packages, fix_issues)))
+
+    def _worker_loop(self):
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            fn, args = task
+            try:
+                fn(*args)
+            except Exception as e:
+                self.log_message(str(e), "error")
 
     def run_build_process(self, flags, clean, build_dll, use_cmake, compiler_pref, reinstall, no_run, extra_packages, fix_issues):
         try:
-            # Gather extensions info
-            ext_includes = []
-            ext_libs = []
-            ext_flags = []
-            
-            for ext in self.extension_manager.get_all_extensions():
-                if ext.is_installed():
-                    inc = ext.get_include_path()
-                    lib = ext.get_lib_path()
-                    lnk = ext.get_link_flags()
-                    if inc: ext_includes.append(inc)
-                    if lib: ext_libs.append(lib)
-                    if lnk: ext_flags.extend(lnk)
+            # Gather extensions info (reused across builds until the extension list changes)
+            # Only trusted while the Extensions tab's status poll is running to invalidate it
+            if self._ext_tab_ready and self._ext_cache and self._ext_cache[0] == self._ext_cache_version:
+                # Fresh lists each build: the builder appends fetched extensions to them
+                ext_includes, ext_libs, ext_flags = (list(x) for x in self._ext_cache[1:])
+            else:
+                cache_version = self._ext_cache_version
+                ext_includes = []
+                ext_libs = []
+                ext_flags = []
+
+                for ext in self.extension_manager.get_all_extensions():
+                    if self._is_installed(ext):
+                        inc = ext.get_include_path()
+                        lib = ext.get_lib_path()
+                        lnk = ext.get_link_flags()
+                        if inc: ext_includes.append(inc)
+                        if lib: ext_libs.append(lib)
+                        if lnk: ext_flags.extend(lnk)
+                self._ext_cache = (cache_version, tuple(ext_includes), tuple(ext_libs), tuple(ext_flags))
             
             if fix_issues:
                 # Use fix_issues method instead of build_and_run
@@ -595,17 +936,29 @@ class App(ctk.CTk):
         except Exception as e:
             self.log_message(f"A critical error occurred: {e}", "error")
         finally:
-            self.after(0, lambda: self.build_btn.configure(state="normal"))
+            self.after(0, self._build_finished)
+
+    def _build_finished(self):
+        self._building = False
+        self.build_btn.configure(state="normal")
 
     def quit(self):
+        # Queued installs/builds are dropped and the worker stops after the current one
+        self._closing = True
+        for q in (self._tasks, self._log_q):
+            try:
+                while True:
+                    q.get_nowait()
+            except queue.Empty:
+                pass
+        self._tasks.put(None)
+        if self._observer is not None:
+            self._observer.stop()
         self.destroy()
 
 if __name__ == "__main__":
-    try:
-        import multiprocessing
-        multiprocessing.freeze_support()
-    except:
-        pass
+    import multiprocessing
+    multiprocessing.freeze_support()
 
     app = App()
     app.mainloop()
\ No newline at end of file
@@ -1,4 +1,7 @@
+import os
 import re
+import mmap
+import concurrent.futures
 
 # Simple mapping of common headers to vcpkg package names
 # This is non-exhaustive and will need updates.
@@ -47,22 +50,108 @@ PACKAGE_LIBS = {
     "sdl2": ["SDL2main", "SDL2"],
 }
 
-def find_includes(file_path):
+# All four directives in one pattern, compiled once, so a file is read and scanned in a
+# single pass. It runs over the whole mapped file, so [^\S\n] stands in for \s wherever
+# a match must not cross a line. The trailing version/flags groups are captured inside
+# lookaheads: they see the rest of the line as before but don't consume it, so another
+# directive later on the same line (e.g. "// @vcpkg pkg") is still found.
+_SCAN_RE = re.compile(
+    # #include <path> or #include "path"
+    rb'(?m)^[^\S\n]*#include[^\S\n]*[<"]([^>"\n]+)[>"]'
+    # // @fetch <url> [version]
+    rb'|//[^\S\n]*@fetch[^\S\n]+(https://github\.com/[^\s@]+)(?=(?:[^\S\n]*@?[^\S\n]*([^\s]+))?)'
+    # //$[path](name) [flags]
+    rb'|//[^\S\n]*\$\[([^\]\n]+)\]\(([^)\n]+)\)(?=(.*))'
+    # // @vcpkg <package>
+    rb'|//[^\S\n]*@vcpkg[^\S\n]+([^\s]+)'
+)
+
+def _scan_groups(file_path, pattern):
     """
-    Scans a C/C++ file for #include directives.
-    Returns a set of included files (strings).
+    Runs a bytes pattern over the whole file in one finditer call (the regex
+    engine walks the mapped file instead of a Python loop over lines).
+    Returns the groups of every match, decoded as UTF-8.
+    """
+    with open(file_path, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            buf = f.read()
+        try:
+            return [tuple(g.decode('utf-8', 'replace') if g is not None else None for g in m.groups())
+                    for m in pattern.finditer(buf)]
+        finally:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+
+# abspath -> (st_mtime_ns, st_size, results); lets repeated builds in one session skip
+# unchanged files
+_SCAN_CACHE = {}
+
+def clear_scan_cache():
+    """Forgets every remembered scan_source result."""
+    _SCAN_CACHE.clear()
+
+def scan_source(file_path):
     """
+    Scans a C/C++ file once for every directive Cmpile understands.
+    Returns (includes, fetches, local_libs, vcpkg_packages): a set of included
+    files, then lists shaped like find_github_fetches, find_local_libs and
+    find_vcpkg_directives return. Results are reused while the file's mtime
+    and size are unchanged.
+    """
+    key = os.path.abspath(file_path)
+    try:
+        st = os.stat(key)
+    except OSError:
+        st = None
+    if st is not None:
+        cached = _SCAN_CACHE.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            includes, fetches, libs, packages = cached[2]
+            return set(includes), list(fetches), list(libs), list(packages)
+
     includes = set()
+    fetches = []
+    libs = []
+    packages = []
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                # Regex for #include <path> or #include "path"
-                match = re.search(r'^\s*#include\s*[<"]([^>"]+)[>"]', line)
-                if match:
-                    includes.add(match.group(1))
+        for inc, url, version, path, name, flags, pkg in _scan_groups(file_path, _SCAN_RE):
+            if inc is not None:
+                includes.add(inc)
+            elif url is not None:
+                fetches.append((url.strip(), version.strip() if version else "main"))
+            elif path is not None:
+                libs.append((path.strip(), name.strip(), flags.strip()))
+            else:
+                packages.append(pkg.strip())
     except Exception as e:
         print(f"Error reading {file_path}: {e}")
-    return includes
+        return includes, fetches, libs, packages
+    if st is not None:
+        _SCAN_CACHE[key] = (st.st_mtime_ns, st.st_size, (frozenset(includes), tuple(fetches), tuple(libs), tuple(packages)))
+    return includes, fetches, libs, packages
+
+def scan_sources(paths):
+    """
+    scan_source for many files at once, on a thread pool so the opens, stats
+    and page-ins of one file overlap the regex pass of another.
+    Returns the results in the order of paths.
+    """
+    paths = list(paths)
+    if len(paths) < 2:
+        return [scan_source(p) for p in paths]
+    workers = min(32, (os.cpu_count() or 4) * 4, len(paths))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(scan_source, paths))
+
+def find_includes(file_path):
+    """
+    Scans a C/C++ file for #include directives.
+    Returns a set of included files (strings).
+    """
+    return scan_source(file_path)[0]
 
 def find_github_fetches(file_path):
     """
@@ -70,19 +159,7 @@ def find_github_fetches(file_path):
     Format: // @fetch https://github.com/user/repo [version]
     Returns a list of tuples (repo_url, version).
     """
-    fetches = []
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                # Regex for // @fetch <url> [version]
-                match = re.search(r'//\s*@fetch\s+(https://github\.com/[^\s@]+)(?:\s*@?\s*([^\s]+))?', line)
-                if match:
-                    repo_url = match.group(1).strip()
-                    version = match.group(2).strip() if match.group(2) else "main"
-                    fetches.append((repo_url, version))
-    except Exception as e:
-        print(f"Error reading {file_path} for fetches: {e}")
-    return fetches
+    return scan_source(file_path)[1]
 
 def find_local_libs(file_path):
     """
@@ -90,20 +167,7 @@ def find_local_libs(file_path):
     Format: //$[path](name) [flags]
     Returns a list of tuples (path, name, flags).
     """
-    libs = []
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                # Regex for //$[path](name)
-                match = re.search(r'//\s*\$\[([^\]]+)\]\(([^)]+)\)(.*)', line)
-                if match:
-                    path = match.group(1).strip()
-                    name = match.group(2).strip()
-                    flags = match.group(3).strip()
-                    libs.append((path, name, flags))
-    except Exception as e:
-        print(f"Error reading {file_path} for local libs: {e}")
-    return libs
+    return scan_source(file_path)[2]
 
 def find_vcpkg_directives(file_path):
     """
@@ -111,18 +175,19 @@ def find_vcpkg_directives(file_path):
     Format: // @vcpkg <package_name>
     Returns a list of package names.
     """
-    packages = []
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                # Regex for // @vcpkg <package>
-                match = re.search(r'//\s*@vcpkg\s+([^\s]+)', line)
-                if match:
-                    pkg = match.group(1).strip()
-                    packages.append(pkg)
-    except Exception as e:
-        print(f"Error reading {file_path} for vcpkg directives: {e}")
-    return packages
+    return scan_source(file_path)[3]
+
+# Root folder -> package for the slash-style keys of HEADER_MAPPING, so any header under a
+# known root (e.g. GLFW/glfw3native.h) maps with one lookup. boost and GL are left out:
+# they are split across many packages, and the mapped header only names one of them.
+_ROOT_INDEX = {k.split('/', 1)[0]: v for k, v in HEADER_MAPPING.items()
+               if '/' in k and k.split('/', 1)[0] not in ("boost", "GL")}
+
+# Roots of slash-style system/toolchain headers (<sys/types.h>, <bits/stdc++.h>, ...) that
+# the root-folder heuristic would otherwise turn into bogus package names
+_SYSTEM_ROOTS = frozenset({
+    "sys", "bits", "linux", "asm", "netinet", "arpa", "net", "ext", "tr1", "experimental",
+})
 
 def map_includes_to_packages(includes):
     """
@@ -144,8 +209,12 @@ def map_includes_to_packages(includes):
         
         # We can detect if it looks like a library (has a slash)
         if '/' in inc:
-            parts = inc.split('/')
-            root = parts[0]
+            root = inc.split('/', 1)[0]
+            if root in _SYSTEM_ROOTS:
+                continue
+            if root in _ROOT_INDEX:
+                packages.add(_ROOT_INDEX[root])
+                continue
             
             # Special handling for Qt
             # Maps QtWidgets, QtCore, QtNetwork, etc. to 'qtbase' (Qt6 default in vcpkg)
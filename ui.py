@@ -1,21 +1,174 @@
 import argparse
+import contextlib
+import functools
+import os
 import sys
-from rich.console import Console
-from rich.panel import Panel
-from rich.prompt import Confirm, Prompt
-import version
+from version import VERSION
 
-console = Console()
+# rich is imported on first output, so --help and argument errors only pay for argparse
+_console = None
+
+def _get_console():
+    global _console
+    if _console is None:
+        from rich.console import Console
+        # Terminal, colour and legacy-Windows detection stay automatic (stdout may be redirected
+        # independently of stdin); the repr highlighter is off since it re-scans every message
+        _console = Console(highlight=False)
+    return _console
+
+def __getattr__(name):
+    # Keeps ui.console, ui.Panel, ui.Confirm and ui.Prompt available without the eager import
+    if name == "console":
+        return _get_console()
+    if name == "Panel":
+        from rich.panel import Panel
+        return Panel
+    if name in ("Confirm", "Prompt"):
+        import rich.prompt
+        return getattr(rich.prompt, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Whether stdin is an interactive terminal; probed once, since prompts can come several times per build
+_STDIN_IS_TTY = None
+
+def _stdin_is_tty():
+    global _STDIN_IS_TTY
+    if _STDIN_IS_TTY is None:
+        _STDIN_IS_TTY = sys.stdin is not None and sys.stdin.isatty()
+    return _STDIN_IS_TTY
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+# Keys accepted by _ask; "" is Enter and picks the default
+CONFIRM_ANSWERS = {"y": True, "n": False, "": True}
+COMPILER_ANSWERS = {"1": "1", "2": "2", "": "1"}
+
+def _read_one_char():
+    # A single keypress, without waiting for Enter; None if the terminal can't do that
+    if msvcrt is not None:
+        ch = msvcrt.getwch()
+        if ch == "\x03":
+            raise KeyboardInterrupt
+        if ch in ("\x00", "\xe0"):
+            # Arrow and function keys arrive as a prefix plus a code; both are consumed so the
+            # code isn't read as the next answer, and the pair matches no answer
+            ch += msvcrt.getwch()
+        return ch
+    try:
+        import termios
+        import tty
+        fd = sys.stdin.fileno()
+        old = termios.tcgetattr(fd)
+    except (ImportError, OSError, ValueError):
+        return None
+    try:
+        tty.setcbreak(fd)
+        return sys.stdin.read(1)
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old)
+
+def _ask(prompt, answers):
+    # The prompt ends on the first valid key; the text still goes through the console so markup
+    # and Windows colours work, but rich.prompt's validation machinery is never loaded
+    console = _get_console()
+    while True:
+        console.print(prompt, end="")
+        key = _read_one_char()
+        if key is None:
+            # No raw keyboard access: fall back to a line, judged by its first character
+            key = input().strip()[:1].lower()
+        else:
+            # Only Enter picks the default; Space, Tab and other keys must not
+            key = "" if key in ("\r", "\n") else key.lower()
+            # cbreak/getwch don't echo
+            console.print(key if len(key) == 1 and key.isprintable() else "", markup=False, highlight=False)
+        if key in answers:
+            return answers[key]
+        console.print(f"[red]Please press one of: {'/'.join(k for k in answers if k)}[/red]")
+
+TITLE = f"Cmpile V{VERSION}"
+DESCRIPTION = f"{TITLE} - Compile and Run C/C++ code with ease."
+FILE_INDEPENDENT_FLAGS = frozenset(('--reinstall-tools', '--fix', '--compiler', '--help', '-h'))
 
 def parse_arguments():
-    parser = argparse.ArgumentParser(description=f"Cmpile V{version.VERSION} - Compile and Run C/C++ code with ease.")
-    
-    # Check if any file-independent flags are present
-    file_independent_flags = ['--reinstall-tools', '--fix', '--compiler', '--help', '-h']
-    has_file_independent_flag = any(flag in sys.argv for flag in file_independent_flags)
+    argv = sys.argv[1:]
+    if "-h" in argv or "--help" in argv:
+        # argparse prints the help to sys.stdout and exits; nothing on this path may touch rich
+        return _build_parser(True).parse_args()
+    # Check if any file-independent flags are present (one pass over argv; --compiler=llvm counts too)
+    has_file_independent_flag = any(arg.partition("=")[0] in FILE_INDEPENDENT_FLAGS for arg in argv)
+    args = _fast_parse(argv, has_file_independent_flag)
+    if args is None:
+        args = _build_parser(has_file_independent_flag).parse_args()
+    return args
+
+_BOOL_FLAGS = {
+    "--clean": "clean",
+    "--reinstall-tools": "reinstall_tools",
+    "--dll": "dll",
+    "--no-console": "no_console",
+    "--no-run": "no_run",
+    "--cmake": "cmake",
+    "--fix": "fix",
+}
+_COMPILER_CHOICES = ('llvm', 'winlibs', 'auto')
+
+def _fast_parse(argv, files_optional):
+    """
+    Parses the plain, well-formed command lines in one pass without argparse.
+    Returns None for anything else (--help, --opt=value, abbreviations, unknown
+    or malformed options) so argparse handles it and reports errors as before.
+    """
+    args = argparse.Namespace(files=[], compiler_flags="", install_pkg=None, compiler=None)
+    for dest in _BOOL_FLAGS.values():
+        setattr(args, dest, False)
+    # argparse only accepts the positional files as one contiguous run
+    files_done = False
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if not arg.startswith("-"):
+            if files_done:
+                return None
+            while i < len(argv) and not argv[i].startswith("-"):
+                args.files.append(argv[i])
+                i += 1
+            files_done = True
+            continue
+        if arg in _BOOL_FLAGS:
+            setattr(args, _BOOL_FLAGS[arg], True)
+        elif arg in ("--compiler-flags", "--install-pkg", "--compiler"):
+            if i + 1 >= len(argv) or argv[i + 1].startswith("-"):
+                return None
+            value = argv[i + 1]
+            i += 1
+            if arg == "--compiler-flags":
+                args.compiler_flags = value
+            elif arg == "--install-pkg":
+                if args.install_pkg is None:
+                    args.install_pkg = []
+                args.install_pkg.append(value)
+            elif value in _COMPILER_CHOICES:
+                args.compiler = value
+            else:
+                return None
+        else:
+            return None
+        i += 1
+    if not args.files and not files_optional:
+        return None
+    return args
+
+@functools.lru_cache(maxsize=2)
+def _build_parser(files_optional):
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
     
     # Make files optional if file-independent flags are present
-    if has_file_independent_flag:
+    if files_optional:
         parser.add_argument("files", nargs='*', help="The C/C++ files or folders to compile and run.")
     else:
         parser.add_argument("files", nargs='+', help="The C/C++ files or folders to compile and run.")
@@ -28,44 +181,98 @@ def parse_arguments():
     parser.add_argument("--no-run", action="store_true", help="Compile only, do not run the executable.")
     parser.add_argument("--install-pkg", action="append", help="Install a vcpkg package by name. Can be used multiple times.")
     parser.add_argument("--cmake", action="store_true", help="Use CMake to build the project.")
-    parser.add_argument("--compiler", choices=['llvm', 'winlibs', 'auto'], default=None, help="Specify compiler preference (llvm or winlibs).")
+    parser.add_argument("--compiler", choices=_COMPILER_CHOICES, default=None, help="Specify compiler preference (llvm, winlibs, or auto to detect).")
     parser.add_argument("--fix", action="store_true", help="Attempt to fix common compilation issues (clean build, reinstall tools, auto-fix errors).")
-    return parser.parse_args()
+    return parser
 
 def get_compiler_choice(log_func=None):
     """Prompts the user to select a compiler."""
     # Check if we have a valid stdin
-    if sys.stdin is None or not sys.stdin.isatty():
+    if not _stdin_is_tty():
         msg = "No compiler found. Defaulting to LLVM-MinGW (Clang) because input is not available."
         if log_func:
             log_func(msg, "yellow")
         else:
-            console.print(f"[yellow]{msg}[/yellow]")
+            _get_console().print(f"[yellow]{msg}[/yellow]")
         return "llvm"
 
-    console.print("[yellow]No compiler found. Please select one to install:[/yellow]")
-    console.print("[bold yellow]Note: You can later change compiler by using the --compiler flag[/bold yellow]")
-    console.print("1. [bold green]LLVM-MinGW (Clang)[/bold green] - Portable Clang-based compiler. Fast and modern.")
-    console.print("2. [bold blue]WinLibs (GCC)[/bold blue] - Portable GCC-based compiler. Classic MinGW-w64 experience.")
+    _get_console().print(_get_compiler_menu())
     
-    choice = Prompt.ask("Enter choice", choices=["1", "2"])
+    choice = _ask("Enter choice \\[1/2, default 1]: ", COMPILER_ANSWERS)
     return "llvm" if choice == "1" else "winlibs"
 
+# Static renderables: markup is parsed once and the objects reused on every print
+@functools.lru_cache(maxsize=None)
+def _get_compiler_menu():
+    from rich.text import Text
+    return Text.from_markup("\n".join((
+        "[yellow]No compiler found. Please select one to install:[/yellow]",
+        "[bold yellow]Note: You can later change compiler by using the --compiler flag[/bold yellow]",
+        "1. [bold green]LLVM-MinGW (Clang)[/bold green] - Portable Clang-based compiler. Fast and modern.",
+        "2. [bold blue]WinLibs (GCC)[/bold blue] - Portable GCC-based compiler. Classic MinGW-w64 experience.",
+    )))
+
+@functools.lru_cache(maxsize=None)
+def _get_header():
+    from rich.panel import Panel
+    from rich.text import Text
+    return Panel.fit(Text.from_markup(f"[bold cyan]{TITLE}[/bold cyan]"), border_style="cyan")
+
 def display_header():
-    console.print(Panel.fit(f"[bold cyan]Cmpile V{version.VERSION}[/bold cyan]", border_style="cyan"))
+    if _PLAIN_OUTPUT:
+        _write_plain(f"=== {TITLE} ===")
+        return
+    _get_console().print(_get_header())
+
+def display_message(message, style=""):
+    # Routes a builder log line (message, style) to the matching display_* function
+    if "error" in style or "bold red" in style:
+        display_error(message)
+    elif "success" in style or "bold green" in style:
+        display_success(message)
+    else:
+        display_status(message)
+
+def batched_output():
+    # The console's own buffer context: display_* calls inside it still render, but reach
+    # the terminal as one write when the block exits (rich keeps Windows handling intact)
+    if _PLAIN_OUTPUT:
+        # Plain writes bypass rich's buffer
+        return contextlib.nullcontext()
+    return _get_console()
+
+# Redirected stdout (CI logs, files) gets plain lines and never touches rich; FORCE_COLOR opts back in
+_PLAIN_OUTPUT = sys.stdout is not None and not sys.stdout.isatty() and not os.environ.get("FORCE_COLOR")
+
+def _write_plain(text):
+    # Flushed per line like rich does: child processes (the program run, CMake) write straight
+    # to the inherited stdout and would otherwise overtake lines still in Python's buffer
+    sys.stdout.write(text + "\n")
+    sys.stdout.flush()
+
+def _emit(message, style):
+    # Single output path for the display_* helpers. Markup is off: compiler output is full of
+    # '[...]' that rich would otherwise parse (or reject), and rich caches the parsed style
+    if _PLAIN_OUTPUT:
+        _write_plain(message)
+        return
+    _get_console().print(message, style=style, markup=False)
 
 def display_status(message, style="bold blue"):
-    console.print(f"[{style}]{message}[/{style}]")
+    _emit(message, style)
 
 def display_error(message):
-    console.print(f"[bold red]Error: {message}[/bold red]")
+    _emit(f"Error: {message}", "bold red")
 
 def display_success(message):
-    console.print(f"[bold green]{message}[/bold green]")
+    _emit(message, "bold green")
 
-def get_user_confirmation(prompt_message):
-    if sys.stdin is None or not sys.stdin.isatty():
+def get_user_confirmation(prompt_message, assume_yes=False):
+    if assume_yes:
+        # Pre-answered by a flag: no prompt, no stdin probe
+        return True
+    if not _stdin_is_tty():
         # Assume yes in non-interactive mode
-        console.print(f"[yellow]Automatically confirming '{prompt_message}' because input is not available.[/yellow]")
+        _get_console().print(f"[yellow]Automatically confirming '{prompt_message}' because input is not available.[/yellow]")
         return True
-    return Confirm.ask(f"[yellow]{prompt_message}[/yellow]")
+    return _ask(f"[yellow]{prompt_message}[/yellow] \\[Y/n]: ", CONFIRM_ANSWERS)
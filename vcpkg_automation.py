@@ -1,5 +1,9 @@
 import os
 import subprocess
+import collections
+
+# Lines of vcpkg output repeated in the failure message
+LOG_TAIL_LINES = 40
 
 class VcpkgManager:
     def __init__(self, internal_downloads_path, log_func=print):
@@ -24,30 +28,31 @@ class VcpkgManager:
 
         self.log_func(f"Installing {package_name} for {self.triplet}...")
         try:
-            # Capture output to log it, providing feedback without printing directly
+            # Capture output to log it, providing feedback without printing directly.
+            # stderr shares the pipe: draining only stdout could stall vcpkg once the
+            # unread stderr pipe fills up, and only the tail is kept for the error report.
             process = subprocess.Popen(
                 [self.vcpkg_exe, "install", f"{package_name}:{self.triplet}", f"--host-triplet={self.triplet}"],
                 cwd=self.vcpkg_root,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
                 text=True,
                 encoding='utf-8',
                 errors='replace'
             )
 
-            # Stream stdout
-            if process.stdout:
-                for line in iter(process.stdout.readline, ''):
-                    if line.strip():
-                        self.log_func(line.strip())
-
-            process.wait()
+            tail = collections.deque(maxlen=LOG_TAIL_LINES)
+            with process:
+                for line in process.stdout:
+                    line = line.strip()
+                    if line:
+                        tail.append(line)
+                        self.log_func(line)
 
             if process.returncode != 0:
-                stderr_output = process.stderr.read() if process.stderr else "No stderr output."
                 self.log_func(f"Failed to install {package_name}.", "bold red")
-                if stderr_output.strip():
-                    self.log_func(f"Stderr:\n{stderr_output.strip()}", "bold red")
+                if tail:
+                    self.log_func("Last output:\n" + "\n".join(tail), "bold red")
                 return False
 
             self.log_func(f"Successfully installed {package_name}.", "bold green")